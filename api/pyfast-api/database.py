@@ -1,32 +1,154 @@
-from typing import List, Optional
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Final, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
 from datetime import datetime, date, time, timedelta
+import logging
+import os
+import threading
 import uuid
+from time import monotonic
 import structlog
+from sqlalchemy import select, insert, update, delete, func, text
+from sqlalchemy.orm import Session
 from models import Todo, TodoCreate, TodoUpdate, Priority
-from db import engine, get_db_session
+from db import engine, SessionLocal
 from orm_models import TodoORM
 
 # Initialize logger
 logger = structlog.get_logger("database")
+# Underlying stdlib logger, used for cheap level checks before building debug kwargs
+_std_logger = logging.getLogger("database")
 
 # In-memory storage fallback (used when DATABASE_URL is not set)
-_todos_db: List[Todo] = []
+# Keyed by todo id; insertion order is the listing order
+_todos: "OrderedDict[str, Todo]" = OrderedDict()
+# Immutable view of _todos handed out by get_todos(); rebuilt lazily after writes
+_todos_snapshot: Optional[Tuple[Todo, ...]] = None
+
+@dataclass(slots=True)
+class _StatsCounters:
+    """Running aggregates over the in-memory store, so stats don't rescan it"""
+    total: int = 0
+    completed: int = 0
+    priority_counts: Dict[str, int] = field(default_factory=lambda: {p.value: 0 for p in Priority})
+    # Active todos per due date; the overdue/today/upcoming split depends on
+    # the current date, so it is derived at read time from these buckets
+    active_due_dates: "Counter[date]" = field(default_factory=Counter)
+
+    def add(self, todo: Todo, sign: int = 1) -> None:
+        self.total += sign
+        self.priority_counts[todo.priority.value] += sign
+        if todo.completed:
+            self.completed += sign
+        elif todo.due_date:
+            self.active_due_dates[todo.due_date] += sign
+
+# Built lazily from _todos; None whenever the store was changed wholesale
+_counters: Optional[_StatsCounters] = None
+
+# The engine is created once at import, so the storage backend never changes
+_PERSIST: Final[bool] = engine is not None
+
+# Short-lived cache for list/stats reads, keyed by the read's arguments. Writes
+# in this process clear it, but writes made by another worker can't, so with
+# several workers sharing a database the cache is bypassed rather than serving
+# reads up to the TTL stale (run.py exports the worker count it starts)
+_READ_CACHE_TTL: Final[float] = 1.0
+_READ_CACHE_MAXSIZE: Final[int] = 256
+_READ_CACHE_ENABLED: Final[bool] = not (
+    _PERSIST and int(os.getenv("API_WORKERS") or os.getenv("WEB_CONCURRENCY") or 1) > 1
+)
+_read_cache: Dict[Hashable, Tuple[float, Any]] = {}
+# Bumped on every invalidation so a read that raced a write isn't cached
+_read_cache_generation = 0
+# Guards the generation check + publish against a concurrent invalidation;
+# never held while loading, so misses for different keys don't queue up
+_read_cache_lock = threading.Lock()
+
+# Stored priority string -> enum member, avoids Enum.__call__ per row
+_PRIORITY_FROM_STR: Final[Dict[str, Priority]] = {p.value: p for p in Priority}
+
+class TodoNotFoundError(ValueError):
+    """Raised when a write targets a todo id that does not exist"""
 
 def _use_persistent_storage() -> bool:
-    return engine is not None
+    return _PERSIST
+
+def _invalidate_reads() -> None:
+    """Drop all derived state (snapshot, read cache, stats counters) after the store changes"""
+    global _counters
+    _counters = None
+    _drop_cached_reads()
+
+def _drop_cached_reads() -> None:
+    global _todos_snapshot, _read_cache_generation
+    _todos_snapshot = None
+    with _read_cache_lock:
+        _read_cache_generation += 1
+        _read_cache.clear()
+
+def _record_change(old: Optional[Todo], new: Optional[Todo]) -> None:
+    """Account for a single in-memory write: adjust the stats counters and drop cached reads"""
+    if _counters is not None:
+        if old is not None:
+            _counters.add(old, -1)
+        if new is not None:
+            _counters.add(new)
+    _drop_cached_reads()
+
+def _get_counters() -> _StatsCounters:
+    global _counters
+    if _counters is None:
+        counters = _StatsCounters()
+        for todo in _todos.values():
+            counters.add(todo)
+        _counters = counters
+    return _counters
+
+def _cached_read(key: Hashable, load: Callable[[], Any]) -> Any:
+    """Return a cached result for key, calling load() on a miss or once the TTL has passed"""
+    if not _READ_CACHE_ENABLED:
+        return load()
+    entry = _read_cache.get(key)
+    if entry is not None and monotonic() - entry[0] < _READ_CACHE_TTL:
+        return entry[1]
+    generation = _read_cache_generation
+    value = load()
+    with _read_cache_lock:
+        # Skip publishing if a write invalidated the cache while we were loading
+        if generation == _read_cache_generation:
+            if len(_read_cache) >= _READ_CACHE_MAXSIZE:
+                _read_cache.clear()
+            _read_cache[key] = (monotonic(), value)
+    return value
+
+@contextmanager
+def _session_scope(db: Optional[Session] = None) -> Iterator[Session]:
+    """Reuse the caller's (request-scoped) session, or open a short-lived one"""
+    if db is not None:
+        yield db
+        return
+    with SessionLocal() as session:
+        yield session
 
 def _generate_id() -> str:
     """Generate a unique ID for todos"""
     return str(uuid.uuid4())
 
+def _parse_id(todo_id: str) -> Optional[uuid.UUID]:
+    """Convert an API id to the UUID primary key; None if it can't be one (so no row matches)"""
+    try:
+        return uuid.UUID(todo_id)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
 def _get_current_timestamp() -> datetime:
     """Get current timestamp"""
     return datetime.now()
 
 def initialize_sample_data():
     """Initialize the database with sample data"""
-    global _todos_db
-    
     logger.info("Initializing database with sample data")
     
     # Calculate some sample dates
@@ -110,27 +232,32 @@ def initialize_sample_data():
         }
     ]
     
-    if _use_persistent_storage():
+    if _PERSIST:
         # Only seed if table is empty
-        from sqlalchemy import select
-        with next(get_db_session()) as db:
-            count = db.scalar(select(TodoORM).count()) if hasattr(select(TodoORM), 'count') else db.query(TodoORM).count()  # SQLAlchemy 2 vs 1 compat
+        with _session_scope() as db:
+            count = db.scalar(select(func.count()).select_from(TodoORM)) or 0
             if count == 0:
-                for todo_data in sample_todos:
-                    db_todo = TodoORM(
-                        id=_generate_id(),
-                        text=todo_data["text"],
-                        priority=todo_data["priority"].value if isinstance(todo_data["priority"], Priority) else todo_data["priority"],
-                        completed=todo_data["completed"],
-                        created_at=todo_data["created_at"],
-                        updated_at=todo_data["updated_at"],
-                    )
-                    db.add(db_todo)
+                rows = [
+                    {
+                        "id": uuid.uuid4(),
+                        "text": todo_data["text"],
+                        "priority": todo_data["priority"].value,
+                        "completed": todo_data["completed"],
+                        "created_at": todo_data["created_at"],
+                        "updated_at": todo_data["updated_at"],
+                    }
+                    for todo_data in sample_todos
+                ]
+                # Single executemany instead of one ORM INSERT per row
+                db.execute(insert(TodoORM), rows)
                 db.commit()
+                _invalidate_reads()
                 logger.info("Persistent database seeded with sample data")
         return
     else:
-        _todos_db = []
+        # Clear in place: other modules (and the test fixtures) hold a reference to this dict
+        _todos.clear()
+        _invalidate_reads()
         for todo_data in sample_todos:
             todo = Todo(
                 id=_generate_id(),
@@ -140,164 +267,441 @@ def initialize_sample_data():
                 created_at=todo_data["created_at"],
                 updated_at=todo_data["updated_at"]
             )
-            _todos_db.append(todo)
+            _todos[todo.id] = todo
         
-        logger.info("In-memory database initialized", sample_count=len(_todos_db))
+        logger.info("In-memory database initialized", sample_count=len(_todos))
+
+def migrate_legacy_ids() -> None:
+    """
+    Rewrite ids written before the primary key became a Uuid column.
+    SQLite stores Uuid as 32 hex chars, while older rows hold the hyphenated
+    form and would never match a lookup. Safe to run on every startup.
+    """
+    if not _PERSIST or engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        result = conn.execute(text("UPDATE todos SET id = REPLACE(id, '-', '') WHERE id LIKE '%-%'"))
+    if result.rowcount:
+        logger.info("Migrated legacy todo ids", count=result.rowcount)
 
 def _to_model(todo_orm: TodoORM) -> Todo:
     return Todo(
-        id=todo_orm.id,
+        id=str(todo_orm.id),
         text=todo_orm.text,
-        priority=Priority(todo_orm.priority),
+        priority=_PRIORITY_FROM_STR[todo_orm.priority],
         completed=todo_orm.completed,
         created_at=todo_orm.created_at,
         updated_at=todo_orm.updated_at,
     )
 
 
-def get_todos() -> List[Todo]:
-    """Get all todos"""
-    if _use_persistent_storage():
-        from sqlalchemy import select
-        with next(get_db_session()) as db:
-            rows = db.execute(select(TodoORM)).scalars().all()
-            return [_to_model(r) for r in rows]
+def get_todos(
+    filter: Optional[str] = None,
+    search: Optional[str] = None,
+    priority: Optional[str] = None,
+    db: Optional[Session] = None,
+) -> Sequence[Todo]:
+    """
+    Get todos, optionally narrowed down by status filter (active/completed),
+    case-insensitive text search and priority. Results are read-only tuples,
+    served from the read cache for up to _READ_CACHE_TTL seconds.
+    """
+    # Any other filter value (e.g. "all") means no status restriction
+    completed = filter == "completed" if filter in ("active", "completed") else None
+    priority_member = None
+    if priority:
+        # Priority is a str enum, so members and their values both resolve here
+        priority_member = _PRIORITY_FROM_STR.get(priority)
+        if priority_member is None:
+            # Unknown priority can't match anything; skip the store entirely
+            return ()
+    return _cached_read(
+        ("todos", completed, search, priority_member),
+        lambda: _load_todos(completed, search, priority_member, db),
+    )
+
+def _load_todos(
+    completed: Optional[bool],
+    search: Optional[str],
+    priority: Optional[Priority],
+    db: Optional[Session],
+) -> Sequence[Todo]:
+    if _PERSIST:
+        stmt = select(TodoORM)
+        if completed is not None:
+            stmt = stmt.where(TodoORM.completed == completed)
+        if search:
+            stmt = stmt.where(TodoORM.text.icontains(search, autoescape=True))
+        if priority is not None:
+            stmt = stmt.where(TodoORM.priority == priority.value)
+        with _session_scope(db) as db:
+            rows = db.execute(stmt).scalars().all()
+            return tuple(_to_model(r) for r in rows)
     else:
-        if not _todos_db:
+        if not _todos:
             initialize_sample_data()
-        return _todos_db.copy()
+        global _todos_snapshot
+        if _todos_snapshot is None:
+            _todos_snapshot = tuple(_todos.values())
+        if completed is None and not search and priority is None:
+            return _todos_snapshot
+        search_lower = search.lower() if search else None
+        return tuple(
+            todo for todo in _todos_snapshot
+            if (completed is None or todo.completed == completed)
+            and (search_lower is None or search_lower in todo.text.lower())
+            and (priority is None or todo.priority is priority)
+        )
 
-def get_todo_by_id(todo_id: str) -> Optional[Todo]:
+def get_todo_by_id(todo_id: str, db: Optional[Session] = None) -> Optional[Todo]:
     """Get a todo by its ID"""
-    if _use_persistent_storage():
-        with next(get_db_session()) as db:
-            row = db.get(TodoORM, todo_id)
+    if _PERSIST:
+        pk = _parse_id(todo_id)
+        if pk is None:
+            return None
+        with _session_scope(db) as db:
+            # Session.get checks the identity map before emitting a SELECT
+            row = db.get(TodoORM, pk)
             return _to_model(row) if row else None
     else:
-        if not _todos_db:
+        if not _todos:
             initialize_sample_data()
-        for todo in _todos_db:
-            if todo.id == todo_id:
-                return todo
-        return None
+        return _todos.get(todo_id)
 
-def create_todo(todo_data: TodoCreate) -> Todo:
+def create_todo(todo_data: TodoCreate, db: Optional[Session] = None) -> Todo:
     """Create a new todo"""
-    logger.debug("Creating new todo", text=todo_data.text, priority=todo_data.priority, completed=todo_data.completed)
-    if _use_persistent_storage():
-        with next(get_db_session()) as db:
+    if _std_logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Creating new todo", text=todo_data.text, priority=todo_data.priority, completed=todo_data.completed)
+    if _PERSIST:
+        with _session_scope(db) as db:
             now = _get_current_timestamp()
-            new_id = _generate_id()
-            row = TodoORM(
+            new_id = uuid.uuid4()
+            # INSERT ... RETURNING hands back the row without a follow-up SELECT
+            stmt = insert(TodoORM).values(
                 id=new_id,
                 text=todo_data.text,
-                priority=todo_data.priority.value if isinstance(todo_data.priority, Priority) else todo_data.priority,
+                priority=todo_data.priority.value,
                 completed=todo_data.completed,
                 created_at=now,
                 updated_at=now,
-            )
-            db.add(row)
+            ).returning(TodoORM)
+            created = _to_model(db.execute(stmt).scalar_one())
             db.commit()
-            db.refresh(row)
-            created = _to_model(row)
-            logger.info("Todo created (persistent)", todo_id=new_id)
+            _invalidate_reads()
+            if _std_logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Todo created (persistent)", todo_id=created.id)
             return created
     else:
-        if not _todos_db:
+        if not _todos:
             initialize_sample_data()
+        now = _get_current_timestamp()
         new_todo = Todo(
             id=_generate_id(),
             text=todo_data.text,
             priority=todo_data.priority,
             completed=todo_data.completed,
-            created_at=_get_current_timestamp(),
-            updated_at=_get_current_timestamp()
+            created_at=now,
+            updated_at=now
         )
-        _todos_db.append(new_todo)
-        logger.info("Todo created (memory)", todo_id=new_todo.id, total_todos=len(_todos_db))
+        _todos[new_todo.id] = new_todo
+        _record_change(None, new_todo)
+        if _std_logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Todo created (memory)", todo_id=new_todo.id, total_todos=len(_todos))
         return new_todo
 
-def update_todo(todo_id: str, todo_data: TodoUpdate) -> Todo:
+def create_todos(items: Sequence[TodoCreate], db: Optional[Session] = None) -> List[Todo]:
+    """Create several todos in one pass; returns them in input order"""
+    now = _get_current_timestamp()
+    if _PERSIST:
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "text": item.text,
+                "priority": item.priority.value,
+                "completed": item.completed,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in items
+        ]
+        if not rows:
+            return []
+        with _session_scope(db) as db:
+            # One executemany INSERT; ids are generated here, so no RETURNING is needed
+            db.execute(insert(TodoORM), rows)
+            db.commit()
+            _invalidate_reads()
+        return [
+            Todo(
+                id=str(row["id"]),
+                text=row["text"],
+                priority=_PRIORITY_FROM_STR[row["priority"]],
+                completed=row["completed"],
+                created_at=now,
+                updated_at=now,
+            )
+            for row in rows
+        ]
+    else:
+        if not _todos:
+            initialize_sample_data()
+        created = []
+        for item in items:
+            new_todo = Todo(
+                id=_generate_id(),
+                text=item.text,
+                priority=item.priority,
+                completed=item.completed,
+                created_at=now,
+                updated_at=now
+            )
+            _todos[new_todo.id] = new_todo
+            _record_change(None, new_todo)
+            created.append(new_todo)
+        if _std_logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Todos created (memory)", count=len(created), total_todos=len(_todos))
+        return created
+
+def update_todo(todo_id: str, todo_data: TodoUpdate, db: Optional[Session] = None) -> Todo:
     """Update an existing todo"""
-    if _use_persistent_storage():
-        with next(get_db_session()) as db:
-            row = db.get(TodoORM, todo_id)
-            if not row:
-                raise ValueError(f"Todo with id {todo_id} not found")
-            update_data = todo_data.dict(exclude_unset=True)
-            if "text" in update_data:
-                row.text = update_data["text"]
-            if "priority" in update_data and update_data["priority"] is not None:
-                val = update_data["priority"]
-                row.priority = val.value if isinstance(val, Priority) else val
-            if "completed" in update_data and update_data["completed"] is not None:
-                row.completed = update_data["completed"]
-            row.updated_at = _get_current_timestamp()
-            db.add(row)
+    if _PERSIST:
+        pk = _parse_id(todo_id)
+        if pk is None:
+            raise TodoNotFoundError(f"Todo with id {todo_id} not found")
+        with _session_scope(db) as db:
+            # Only touch fields the client actually sent; Pydantic has already
+            # coerced priority to a Priority member
+            fields_set = todo_data.model_fields_set
+            changes = {"updated_at": _get_current_timestamp()}
+            if "text" in fields_set:
+                changes["text"] = todo_data.text
+            if "priority" in fields_set and todo_data.priority is not None:
+                changes["priority"] = todo_data.priority.value
+            if "completed" in fields_set and todo_data.completed is not None:
+                changes["completed"] = todo_data.completed
+            # UPDATE ... RETURNING both applies the change and reports a missing id
+            stmt = update(TodoORM).where(TodoORM.id == pk).values(**changes).returning(TodoORM)
+            row = db.execute(stmt).scalar_one_or_none()
+            if row is None:
+                raise TodoNotFoundError(f"Todo with id {todo_id} not found")
+            updated = _to_model(row)
             db.commit()
-            db.refresh(row)
-            return _to_model(row)
+            _invalidate_reads()
+            return updated
     else:
-        if not _todos_db:
+        if not _todos:
             initialize_sample_data()
-        for i, todo in enumerate(_todos_db):
-            if todo.id == todo_id:
-                update_data = todo_data.dict(exclude_unset=True)
-                updated_todo = Todo(
-                    id=todo.id,
-                    text=update_data.get("text", todo.text),
-                    priority=update_data.get("priority", todo.priority),
-                    completed=update_data.get("completed", todo.completed),
-                    created_at=todo.created_at,
-                    updated_at=_get_current_timestamp()
-                )
-                _todos_db[i] = updated_todo
-                return updated_todo
-        raise ValueError(f"Todo with id {todo_id} not found")
+        todo = _todos.get(todo_id)
+        if todo is None:
+            raise TodoNotFoundError(f"Todo with id {todo_id} not found")
+        fields_set = todo_data.model_fields_set
+        updated_todo = Todo(
+            id=todo.id,
+            text=todo_data.text if "text" in fields_set else todo.text,
+            priority=todo_data.priority if "priority" in fields_set else todo.priority,
+            completed=todo_data.completed if "completed" in fields_set else todo.completed,
+            created_at=todo.created_at,
+            updated_at=_get_current_timestamp()
+        )
+        _todos[todo_id] = updated_todo
+        _record_change(todo, updated_todo)
+        return updated_todo
+
+def toggle_todo(todo_id: str, db: Optional[Session] = None) -> Todo:
+    """Flip a todo's completion status"""
+    if _PERSIST:
+        pk = _parse_id(todo_id)
+        if pk is None:
+            raise TodoNotFoundError(f"Todo with id {todo_id} not found")
+        with _session_scope(db) as db:
+            # Flip the flag inside the UPDATE itself, so no prior SELECT is needed
+            stmt = (
+                update(TodoORM)
+                .where(TodoORM.id == pk)
+                .values(completed=~TodoORM.completed, updated_at=_get_current_timestamp())
+                .returning(TodoORM)
+            )
+            row = db.execute(stmt).scalar_one_or_none()
+            if row is None:
+                raise TodoNotFoundError(f"Todo with id {todo_id} not found")
+            toggled = _to_model(row)
+            db.commit()
+            _invalidate_reads()
+            return toggled
+    else:
+        if not _todos:
+            initialize_sample_data()
+        todo = _todos.get(todo_id)
+        if todo is None:
+            raise TodoNotFoundError(f"Todo with id {todo_id} not found")
+        toggled = todo.model_copy(
+            update={"completed": not todo.completed, "updated_at": _get_current_timestamp()}
+        )
+        _todos[todo_id] = toggled
+        _record_change(todo, toggled)
+        return toggled
 
-def delete_todo(todo_id: str) -> bool:
+def bulk_set_completed(todo_ids: Iterable[str], completed: bool, db: Optional[Session] = None) -> int:
+    """Set the completion status of many todos in one pass; unknown ids are skipped. Returns the number updated"""
+    if _PERSIST:
+        pks = [pk for pk in map(_parse_id, todo_ids) if pk is not None]
+        if not pks:
+            return 0
+        with _session_scope(db) as db:
+            # One UPDATE ... WHERE id IN (...) instead of a statement per todo
+            stmt = (
+                update(TodoORM)
+                .where(TodoORM.id.in_(pks))
+                .values(completed=completed, updated_at=_get_current_timestamp())
+            )
+            result = db.execute(stmt)
+            db.commit()
+            _invalidate_reads()
+            return result.rowcount or 0
+    else:
+        if not _todos:
+            initialize_sample_data()
+        now = _get_current_timestamp()
+        updated_count = 0
+        for todo_id in set(todo_ids):
+            todo = _todos.get(todo_id)
+            if todo is None:
+                continue
+            updated = todo.model_copy(update={"completed": completed, "updated_at": now})
+            _todos[todo_id] = updated
+            _record_change(todo, updated)
+            updated_count += 1
+        return updated_count
+
+def delete_todo(todo_id: str, db: Optional[Session] = None) -> bool:
     """Delete a todo by its ID"""
-    if _use_persistent_storage():
-        with next(get_db_session()) as db:
-            row = db.get(TodoORM, todo_id)
-            if not row:
+    if _PERSIST:
+        pk = _parse_id(todo_id)
+        if pk is None:
+            return False
+        with _session_scope(db) as db:
+            # DELETE ... RETURNING reports a missing id without a separate lookup
+            stmt = delete(TodoORM).where(TodoORM.id == pk).returning(TodoORM.id)
+            deleted_id = db.execute(stmt).scalar_one_or_none()
+            if deleted_id is None:
                 return False
-            db.delete(row)
             db.commit()
+            _invalidate_reads()
             return True
     else:
-        if not _todos_db:
+        if not _todos:
             initialize_sample_data()
-        for i, todo in enumerate(_todos_db):
-            if todo.id == todo_id:
-                del _todos_db[i]
-                return True
-        return False
+        removed = _todos.pop(todo_id, None)
+        if removed is None:
+            return False
+        _record_change(removed, None)
+        return True
 
-def clear_completed_todos() -> int:
+def clear_completed_todos(db: Optional[Session] = None) -> int:
     """Delete all completed todos and return count of deleted items"""
-    if _use_persistent_storage():
-        from sqlalchemy import delete
-        with next(get_db_session()) as db:
+    if _PERSIST:
+        with _session_scope(db) as db:
             result = db.execute(delete(TodoORM).where(TodoORM.completed.is_(True)))
             db.commit()
+            _invalidate_reads()
             # result.rowcount may be None depending on DB; fallback to recount
             return result.rowcount or 0
     else:
-        if not _todos_db:
+        if not _todos:
+            initialize_sample_data()
+        # Only the ids being removed are collected; surviving todos stay in place
+        completed_ids = [todo_id for todo_id, todo in _todos.items() if todo.completed]
+        for todo_id in completed_ids:
+            _record_change(_todos.pop(todo_id), None)
+        return len(completed_ids)
+
+def candidates_for_reminders(today: date, tomorrow: date, db: Optional[Session] = None) -> List[Todo]:
+    """
+    Get active todos with a reminder set that are due today or tomorrow.
+    Callers apply the exact reminder window to this small candidate set.
+    """
+    if _PERSIST:
+        with _session_scope(db) as db:
+            stmt = select(TodoORM).where(
+                TodoORM.completed.is_(False),
+                TodoORM.reminder_time.isnot(None),
+                TodoORM.due_date.in_((today, tomorrow)),
+            )
+            # _to_model skips the schedule fields; copy them over without
+            # re-running the past-due-date validator
+            return [
+                _to_model(row).model_copy(
+                    update={"due_date": row.due_date, "reminder_time": row.reminder_time}
+                )
+                for row in db.scalars(stmt)
+            ]
+    else:
+        if not _todos:
             initialize_sample_data()
-        initial_count = len(_todos_db)
-        _todos_db[:] = [todo for todo in _todos_db if not todo.completed]
-        deleted_count = initial_count - len(_todos_db)
-        return deleted_count
+        return [
+            todo for todo in _todos.values()
+            if not todo.completed
+            and todo.reminder_time is not None
+            and todo.due_date in (today, tomorrow)
+        ]
 
-def get_todos_count() -> int:
+def get_todos_count(db: Optional[Session] = None) -> int:
     """Get total number of todos"""
-    if _use_persistent_storage():
-        from sqlalchemy import select, func
-        with next(get_db_session()) as db:
+    if _PERSIST:
+        with _session_scope(db) as db:
             return db.scalar(select(func.count()).select_from(TodoORM)) or 0
     else:
-        if not _todos_db:
+        if not _todos:
             initialize_sample_data()
-        return len(_todos_db)
+        return len(_todos)
+
+def get_stats(db: Optional[Session] = None) -> dict:
+    """Get todo statistics (totals, priority breakdown, due dates) in a single pass"""
+    stats = _cached_read(("stats",), lambda: _compute_stats(db))
+    # Copy so callers can't modify the cached entry
+    return dict(stats, priority_breakdown=dict(stats["priority_breakdown"]))
+
+def _compute_stats(db: Optional[Session]) -> dict:
+    today = date.today()
+    next_week = today + timedelta(days=7)
+    if _PERSIST:
+        is_active = TodoORM.completed == False  # noqa: E712
+        stmt = select(
+            func.count(),
+            func.count().filter(TodoORM.completed == True),  # noqa: E712
+            func.count().filter(TodoORM.priority == Priority.HIGH.value),
+            func.count().filter(TodoORM.priority == Priority.MEDIUM.value),
+            func.count().filter(TodoORM.priority == Priority.LOW.value),
+            func.count().filter(is_active, TodoORM.due_date < today),
+            func.count().filter(is_active, TodoORM.due_date == today),
+            func.count().filter(is_active, TodoORM.due_date > today, TodoORM.due_date <= next_week),
+        )
+        with _session_scope(db) as db:
+            total, completed, high, medium, low, overdue, due_today, upcoming = db.execute(stmt).one()
+        priority_counts = {"high": high, "medium": medium, "low": low}
+    else:
+        if not _todos:
+            initialize_sample_data()
+        # O(1) in the number of todos: only the distinct due dates are visited
+        counters = _get_counters()
+        total, completed = counters.total, counters.completed
+        priority_counts = dict(counters.priority_counts)
+        overdue = due_today = upcoming = 0
+        for due_date, count in counters.active_due_dates.items():
+            if due_date < today:
+                overdue += count
+            elif due_date == today:
+                due_today += count
+            elif due_date <= next_week:
+                upcoming += count
+    
+    return {
+        "total": total,
+        "active": total - completed,
+        "completed": completed,
+        "completion_rate": round((completed / total * 100), 2) if total > 0 else 0,
+        "priority_breakdown": priority_counts,
+        "overdue_count": overdue,
+        "due_today_count": due_today,
+        "upcoming_count": upcoming
+    }
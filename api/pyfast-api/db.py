@@ -27,7 +27,11 @@ def create_sqlalchemy_engine():
 
 
 engine = create_sqlalchemy_engine()
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True) if engine else None
+# expire_on_commit=False keeps loaded rows usable after commit instead of
+# re-SELECTing them on next attribute access
+SessionLocal = sessionmaker(
+    bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True
+) if engine else None
 
 
 def get_db_session():
@@ -40,3 +44,13 @@ def get_db_session():
         db.close()
 
 
+def get_request_session():
+    """FastAPI dependency yielding one session per request, or None when persistence is disabled"""
+    if not SessionLocal:
+        yield None
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
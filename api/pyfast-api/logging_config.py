@@ -3,20 +3,20 @@ Logging configuration for SpicyTodo API
 Provides structured logging with different levels and outputs
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import orjson
 import structlog
 from colorama import Fore, Style, init
 
-# Initialize colorama for colored console output
-init(autoreset=True)
-
 # Log levels
 LOG_LEVELS = {
     "DEBUG": logging.DEBUG,
@@ -49,13 +49,30 @@ class ColoredFormatter(logging.Formatter):
         
         return super().format(record)
 
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """json.dumps-compatible serializer for structlog's JSONRenderer, backed by orjson"""
+    return orjson.dumps(obj, default=kwargs.get("default"), option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Background listener that drains the log queue when queued logging is enabled
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the background log listener, if one is running"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
+
 def setup_logging(
     log_level: str = "INFO",
     log_file: str = None,
     log_dir: str = "logs",
     enable_console: bool = True,
     enable_file: bool = True,
-    enable_json: bool = False
+    enable_json: bool = False,
+    enable_queue: bool = False
 ) -> None:
     """
     Setup structured logging for the application
@@ -67,7 +84,10 @@ def setup_logging(
         enable_console: Enable console logging
         enable_file: Enable file logging
         enable_json: Use JSON format for logs
+        enable_queue: Hand records to a background thread so handler I/O
+            stays off the request path
     """
+    global _queue_listener
     
     # Create logs directory if it doesn't exist
     if enable_file:
@@ -80,19 +100,26 @@ def setup_logging(
     
     log_file_path = Path(log_dir) / log_file
     
-    # Configure structlog
+    # Configure structlog; keep the per-event processor chain as short as possible
+    processors = [
+        structlog.stdlib.filter_by_level,
+        # Per-request fields bound once by LoggingMiddleware
+        structlog.contextvars.merge_contextvars,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+    if LOG_LEVELS.get(log_level.upper(), logging.INFO) <= logging.DEBUG:
+        processors.append(structlog.processors.StackInfoRenderer())
+    if enable_json:
+        # ConsoleRenderer formats exc_info itself; only JSON needs it pre-rendered
+        processors.append(structlog.processors.format_exc_info)
+        processors.append(structlog.processors.JSONRenderer(serializer=_orjson_dumps))
+    else:
+        processors.append(structlog.dev.ConsoleRenderer(colors=True))
+    
     structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if enable_json else structlog.dev.ConsoleRenderer(colors=True),
-        ],
+        processors=processors,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
@@ -103,8 +130,10 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(LOG_LEVELS.get(log_level.upper(), logging.INFO))
     
-    # Clear existing handlers
+    # Clear existing handlers (and drain any previous listener first)
+    _stop_queue_listener()
     root_logger.handlers.clear()
+    handlers = []
     
     # Console handler
     if enable_console:
@@ -122,7 +151,7 @@ def setup_logging(
             )
         
         console_handler.setFormatter(console_formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
     # File handler with rotation
     if enable_file:
@@ -139,19 +168,32 @@ def setup_logging(
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
     
-    # Error file handler (separate file for errors)
+    # Error file handler (separate file for errors, shares the file formatter).
+    # Opened lazily so runs that never log an error don't hold an extra file open.
     if enable_file:
         error_file_handler = logging.handlers.RotatingFileHandler(
             Path(log_dir) / f"error_{log_file}",
             maxBytes=5 * 1024 * 1024,  # 5MB
             backupCount=3,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True
         )
         error_file_handler.setLevel(logging.ERROR)
         error_file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(error_file_handler)
+        handlers.append(error_file_handler)
+    
+    if enable_queue and handlers:
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _queue_listener.start()
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
     
     # Configure uvicorn logging
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -168,7 +210,8 @@ def setup_logging(
         console_enabled=enable_console,
         file_enabled=enable_file,
         log_file=str(log_file_path) if enable_file else None,
-        json_format=enable_json
+        json_format=enable_json,
+        queued=enable_queue
     )
 
 def get_logger(name: str) -> structlog.BoundLogger:
@@ -287,6 +330,7 @@ def setup_environment_logging() -> None:
     enable_console = os.getenv("LOG_CONSOLE", "true").lower() == "true"
     enable_file = os.getenv("LOG_FILE", "true").lower() == "true"
     enable_json = os.getenv("LOG_JSON", "false").lower() == "true"
+    enable_queue = os.getenv("LOG_QUEUE", "true").lower() == "true"
     
     # Setup logging
     setup_logging(
@@ -294,8 +338,20 @@ def setup_environment_logging() -> None:
         log_dir=log_dir,
         enable_console=enable_console,
         enable_file=enable_file,
-        enable_json=enable_json
+        enable_json=enable_json,
+        enable_queue=enable_queue
     )
 
-# Initialize logging on module import
-setup_environment_logging()
+# Set once the application has configured logging via init_logging()
+_initialized = False
+
+def init_logging() -> None:
+    """Configure logging from the environment once per process; later calls are no-ops"""
+    global _initialized
+    if _initialized:
+        return
+    
+    # Initialize colorama for colored console output
+    init(autoreset=True)
+    setup_environment_logging()
+    _initialized = True
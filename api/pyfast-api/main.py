@@ -1,65 +1,134 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
-from datetime import datetime
+from fastapi.responses import ORJSONResponse, Response
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+import logging
+import os
+import time
+import orjson
+from datetime import datetime, timedelta
 import uuid
 import structlog
-from models import Todo, TodoCreate, TodoUpdate, TodoResponse
-from db import engine, Base
-from database import get_todos, create_todo, update_todo, delete_todo, get_todo_by_id
-from logging_config import get_logger, log_database_operation, log_business_logic
-from middleware import LoggingMiddleware, ErrorHandlingMiddleware
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from models import Todo, TodoCreate, TodoUpdate, TodoResponse, TodoBulkCreate, TodoBulkResponse, Priority
+from db import engine, Base, get_request_session
+from database import (
+    get_todos, create_todo, create_todos, update_todo, delete_todo, get_todo_by_id, get_stats,
+    clear_completed_todos, toggle_todo, candidates_for_reminders, migrate_legacy_ids,
+    TodoNotFoundError
+)
+from logging_config import get_logger, init_logging, log_database_operation, log_business_logic
+from middleware import LoggingMiddleware, SelectiveGZipMiddleware
 
 # Initialize logger
 logger = get_logger(__name__)
+# Underlying stdlib logger, used for cheap level checks before building debug kwargs
+_std_logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Configure logging at startup rather than as an import side effect
+    init_logging()
+    logger.info("SpicyTodo API starting up", version="1.0.0")
+    yield
 
 app = FastAPI(
     title="Spicy Todo API",
     description="A spicy FastAPI backend for the todo application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add middleware (order matters - first added is outermost)
-app.add_middleware(ErrorHandlingMiddleware)
 app.add_middleware(LoggingMiddleware)
 
-# CORS middleware for frontend integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000", 
-        "http://127.0.0.1:3000",
-        "http://spicy-todo-frontend:3000",  # Docker container name
-        "http://spicy-todo-frontend-dev:3000"  # Development container name
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Compress JSON bodies over ~1 KB (mostly the todo list); health probes are tiny
+# and frequent, so they skip the compressor entirely
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, compresslevel=5, exclude_paths=("/health",))
+
+# CORS middleware for frontend integration; explicit method/header lists let
+# Starlette answer preflights with set lookups instead of echoing wildcards.
+# Set ENABLE_CORS=false when the API is only reached same-origin (e.g. behind a proxy)
+if os.getenv("ENABLE_CORS", "true").lower() == "true":
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000", 
+            "http://127.0.0.1:3000",
+            "http://spicy-todo-frontend:3000",  # Docker container name
+            "http://spicy-todo-frontend-dev:3000"  # Development container name
+        ],
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+        allow_headers=["content-type", "authorization"],
+    )
+
+# Last-resort JSON 500 for errors raised outside LoggingMiddleware (which already
+# answers endpoint failures with the same body). Runs in Starlette's own error
+# middleware rather than as another ASGI wrapper around every request
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(
+        "Unhandled exception",
+        method=request.method,
+        path=request.url.path,
+        error=str(exc),
+        error_type=type(exc).__name__
+    )
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
 
 # Auto-create tables if persistence is enabled
 if engine is not None:
-    Base.metadata.create_all(bind=engine)
+    try:
+        Base.metadata.create_all(bind=engine)
+    except OperationalError:
+        # Several workers import this module at once; if another one created
+        # the schema between our existence check and CREATE, just re-check
+        Base.metadata.create_all(bind=engine)
+    migrate_legacy_ids()
     logger.info("Database tables ensured", engine_url=str(engine.url))
 
-# Log application startup
-logger.info("SpicyTodo API starting up", version="1.0.0")
+# Endpoints that touch the database are plain `def` so FastAPI runs them in its
+# threadpool instead of blocking the event loop on synchronous SQLAlchemy calls
+
+# Write endpoints return Todo models the database layer has already validated,
+# so they skip response_model re-validation and only document the schema
+_TODO_RESPONSE_DOC = {200: {"model": TodoResponse}}
+
+# The root payload never changes, so serialize it once at import
+ROOT_BODY = orjson.dumps({"message": "🌶️ Welcome to Spicy Todo API!", "version": "1.0.0"})
+
+# Health probes hit this constantly; rebuild the body at most once per second
+HEALTH_TTL_SECONDS = 1.0
+_health_cache: Tuple[float, bytes] = (float("-inf"), b"")
 
 @app.get("/")
 async def root():
     logger.info("Root endpoint accessed")
-    return {"message": "🌶️ Welcome to Spicy Todo API!", "version": "1.0.0"}
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    logger.debug("Health check endpoint accessed")
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    global _health_cache
+    if _std_logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Health check endpoint accessed")
+    now = time.monotonic()
+    built_at, body = _health_cache
+    if now - built_at >= HEALTH_TTL_SECONDS:
+        body = orjson.dumps({"status": "healthy", "timestamp": datetime.now().isoformat()})
+        _health_cache = (now, body)
+    return Response(content=body, media_type="application/json")
 
 @app.get("/api/todos", response_model=List[TodoResponse])
-async def get_todos_endpoint(
+def get_todos_endpoint(
     filter: Optional[str] = Query(None, description="Filter by: all, active, completed"),
     search: Optional[str] = Query(None, description="Search term for todo text"),
-    priority: Optional[str] = Query(None, description="Filter by priority: low, medium, high")
+    # Validated against the enum, so an unknown priority is a 422 rather than an empty query
+    priority: Optional[Priority] = Query(None, description="Filter by priority: low, medium, high"),
+    db: Optional[Session] = Depends(get_request_session)
 ):
     """
     Get all todos with optional filtering and search
@@ -72,24 +141,10 @@ async def get_todos_endpoint(
             priority=priority
         )
         
-        todos = get_todos()
+        # Filtering happens in the storage layer (SQL WHERE when persistent)
+        todos = get_todos(filter=filter, search=search, priority=priority, db=db)
         log_database_operation(logger, "READ", "todos", success=True, count=len(todos))
         
-        # Apply filters
-        if filter == "active":
-            todos = [todo for todo in todos if not todo.completed]
-        elif filter == "completed":
-            todos = [todo for todo in todos if todo.completed]
-        
-        # Apply search filter
-        if search:
-            search_lower = search.lower()
-            todos = [todo for todo in todos if search_lower in todo.text.lower()]
-        
-        # Apply priority filter
-        if priority:
-            todos = [todo for todo in todos if todo.priority == priority]
-        
         logger.info(
             "Todos retrieved successfully",
             total_count=len(todos),
@@ -110,13 +165,51 @@ async def get_todos_endpoint(
         )
         raise HTTPException(status_code=500, detail=f"Error fetching todos: {str(e)}")
 
+# Registered before GET /api/todos/{todo_id} so "reminders" isn't taken as an id
+@app.get("/api/todos/reminders")
+def get_upcoming_reminders(db: Optional[Session] = Depends(get_request_session)):
+    """
+    Get todos with upcoming reminders
+    """
+    try:
+        now = datetime.now()
+        window_end = now + timedelta(hours=1)
+        
+        # The storage layer narrows things down to open todos with a reminder
+        # due today or tomorrow (the hour window can cross midnight)
+        candidates = candidates_for_reminders(now.date(), now.date() + timedelta(days=1), db)
+        
+        # Get todos with reminders in the next hour
+        upcoming_reminders = []
+        for todo in candidates:
+            # Combine due date and reminder time
+            reminder_datetime = datetime.combine(todo.due_date, todo.reminder_time)
+            
+            # Check if reminder is within the next hour
+            if now <= reminder_datetime <= window_end:
+                upcoming_reminders.append({
+                    "id": todo.id,
+                    "text": todo.text,
+                    "priority": todo.priority,
+                    "due_date": todo.due_date.isoformat(),
+                    "reminder_time": todo.reminder_time.isoformat(),
+                    "reminder_datetime": reminder_datetime.isoformat()
+                })
+        
+        return {
+            "upcoming_reminders": upcoming_reminders,
+            "count": len(upcoming_reminders)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching reminders: {str(e)}")
+
 @app.get("/api/todos/{todo_id}", response_model=TodoResponse)
-async def get_todo(todo_id: str):
+def get_todo(todo_id: str, db: Optional[Session] = Depends(get_request_session)):
     """
     Get a specific todo by ID
     """
     try:
-        todo = get_todo_by_id(todo_id)
+        todo = get_todo_by_id(todo_id, db)
         if not todo:
             raise HTTPException(status_code=404, detail="Todo not found")
         return todo
@@ -125,20 +218,21 @@ async def get_todo(todo_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching todo: {str(e)}")
 
-@app.post("/api/todos", response_model=TodoResponse)
-async def create_todo_endpoint(todo_data: TodoCreate):
+@app.post("/api/todos", response_model=None, responses=_TODO_RESPONSE_DOC)
+def create_todo_endpoint(todo_data: TodoCreate, db: Optional[Session] = Depends(get_request_session)) -> TodoResponse:
     """
     Create a new todo
     """
     try:
-        logger.info(
-            "Creating new todo",
-            text=todo_data.text,
-            priority=todo_data.priority,
-            completed=todo_data.completed
-        )
+        if _std_logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Creating new todo",
+                text=todo_data.text,
+                priority=todo_data.priority,
+                completed=todo_data.completed
+            )
         
-        new_todo = create_todo(todo_data)
+        new_todo = create_todo(todo_data, db)
         log_database_operation(logger, "CREATE", "todos", record_id=new_todo.id, success=True)
         
         log_business_logic(
@@ -163,177 +257,94 @@ async def create_todo_endpoint(todo_data: TodoCreate):
             "Error creating todo",
             error=str(e),
             error_type=type(e).__name__,
-            todo_data=todo_data.dict()
+            todo_data=todo_data.model_dump()
         )
         raise HTTPException(status_code=500, detail=f"Error creating todo: {str(e)}")
 
-@app.put("/api/todos/{todo_id}", response_model=TodoResponse)
-async def update_todo_endpoint(todo_id: str, todo_data: TodoUpdate):
+@app.post("/api/todos/bulk", response_model=None, responses={200: {"model": TodoBulkResponse}})
+def create_todos_bulk_endpoint(bulk_data: TodoBulkCreate, db: Optional[Session] = Depends(get_request_session)) -> TodoBulkResponse:
+    """
+    Create several todos in one request
+    """
+    try:
+        # One validated body and one store write instead of a round-trip per todo
+        created = create_todos(bulk_data.items, db)
+        log_database_operation(logger, "CREATE", "todos", success=True, count=len(created))
+        return TodoBulkResponse.model_construct(items=created)
+    except Exception as e:
+        logger.error("Error creating todos in bulk", error=str(e), error_type=type(e).__name__, count=len(bulk_data.items))
+        raise HTTPException(status_code=500, detail=f"Error creating todos: {str(e)}")
+
+@app.put("/api/todos/{todo_id}", response_model=None, responses=_TODO_RESPONSE_DOC)
+def update_todo_endpoint(todo_id: str, todo_data: TodoUpdate, db: Optional[Session] = Depends(get_request_session)) -> TodoResponse:
     """
     Update an existing todo
     """
     try:
-        # Check if todo exists
-        existing_todo = get_todo_by_id(todo_id)
-        if not existing_todo:
-            raise HTTPException(status_code=404, detail="Todo not found")
-        
-        updated_todo = update_todo(todo_id, todo_data)
-        return updated_todo
-    except HTTPException:
-        raise
+        return update_todo(todo_id, todo_data, db)
+    except TodoNotFoundError:
+        raise HTTPException(status_code=404, detail="Todo not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating todo: {str(e)}")
 
+# Registered before DELETE /api/todos/{todo_id} so "completed" isn't taken as an id
+@app.delete("/api/todos/completed")
+def clear_completed_todos_endpoint(db: Optional[Session] = Depends(get_request_session)):
+    """
+    Delete all completed todos
+    """
+    try:
+        # One bulk DELETE ... WHERE completed instead of a delete per todo
+        deleted_count = clear_completed_todos(db)
+        
+        return {
+            "message": f"Cleared {deleted_count} completed todos",
+            "deleted_count": deleted_count
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing completed todos: {str(e)}")
+
 @app.delete("/api/todos/{todo_id}")
-async def delete_todo_endpoint(todo_id: str):
+def delete_todo_endpoint(todo_id: str, db: Optional[Session] = Depends(get_request_session)):
     """
     Delete a todo
     """
     try:
-        # Check if todo exists
-        existing_todo = get_todo_by_id(todo_id)
-        if not existing_todo:
-            raise HTTPException(status_code=404, detail="Todo not found")
-        
-        success = delete_todo(todo_id)
-        if success:
+        # delete_todo reports a missing id itself, so no existence check first
+        if delete_todo(todo_id, db):
             return {"message": "Todo deleted successfully"}
-        else:
-            raise HTTPException(status_code=500, detail="Error deleting todo")
+        raise HTTPException(status_code=404, detail="Todo not found")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting todo: {str(e)}")
 
-@app.patch("/api/todos/{todo_id}/toggle")
-async def toggle_todo_endpoint(todo_id: str):
+@app.patch("/api/todos/{todo_id}/toggle", response_model=None, responses=_TODO_RESPONSE_DOC)
+def toggle_todo_endpoint(todo_id: str, db: Optional[Session] = Depends(get_request_session)) -> TodoResponse:
     """
     Toggle todo completion status
     """
     try:
-        existing_todo = get_todo_by_id(todo_id)
-        if not existing_todo:
-            raise HTTPException(status_code=404, detail="Todo not found")
-        
-        # Toggle completion status
-        updated_todo = update_todo(todo_id, TodoUpdate(completed=not existing_todo.completed))
-        return updated_todo
-    except HTTPException:
-        raise
+        return toggle_todo(todo_id, db)
+    except TodoNotFoundError:
+        raise HTTPException(status_code=404, detail="Todo not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error toggling todo: {str(e)}")
 
 @app.get("/api/todos/stats/summary")
-async def get_todos_stats():
+def get_todos_stats(db: Optional[Session] = Depends(get_request_session)):
     """
     Get todo statistics summary
     """
     try:
-        from datetime import date, timedelta
-        
-        todos = get_todos()
-        
-        total = len(todos)
-        completed = len([todo for todo in todos if todo.completed])
-        active = total - completed
-        completion_rate = round((completed / total * 100), 2) if total > 0 else 0
-        
-        # Priority breakdown
-        priority_counts = {
-            "high": len([todo for todo in todos if todo.priority == "high"]),
-            "medium": len([todo for todo in todos if todo.priority == "medium"]),
-            "low": len([todo for todo in todos if todo.priority == "low"])
-        }
-        
-        # Due date statistics
-        today = date.today()
-        tomorrow = today + timedelta(days=1)
-        next_week = today + timedelta(days=7)
-        
-        overdue_count = len([
-            todo for todo in todos 
-            if not todo.completed and todo.due_date and todo.due_date < today
-        ])
-        
-        due_today_count = len([
-            todo for todo in todos 
-            if not todo.completed and todo.due_date and todo.due_date == today
-        ])
-        
-        upcoming_count = len([
-            todo for todo in todos 
-            if not todo.completed and todo.due_date and today < todo.due_date <= next_week
-        ])
-        
-        return {
-            "total": total,
-            "active": active,
-            "completed": completed,
-            "completion_rate": completion_rate,
-            "priority_breakdown": priority_counts,
-            "overdue_count": overdue_count,
-            "due_today_count": due_today_count,
-            "upcoming_count": upcoming_count
-        }
+        return get_stats(db=db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
 
-@app.get("/api/todos/reminders")
-async def get_upcoming_reminders():
-    """
-    Get todos with upcoming reminders
-    """
-    try:
-        from datetime import datetime, timedelta
-        
-        todos = get_todos()
-        now = datetime.now()
-        
-        # Get todos with reminders in the next hour
-        upcoming_reminders = []
-        for todo in todos:
-            if (todo.due_date and todo.reminder_time and not todo.completed):
-                # Combine due date and reminder time
-                reminder_datetime = datetime.combine(todo.due_date, todo.reminder_time)
-                
-                # Check if reminder is within the next hour
-                if now <= reminder_datetime <= now + timedelta(hours=1):
-                    upcoming_reminders.append({
-                        "id": todo.id,
-                        "text": todo.text,
-                        "priority": todo.priority,
-                        "due_date": todo.due_date.isoformat(),
-                        "reminder_time": todo.reminder_time.isoformat(),
-                        "reminder_datetime": reminder_datetime.isoformat()
-                    })
-        
-        return {
-            "upcoming_reminders": upcoming_reminders,
-            "count": len(upcoming_reminders)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching reminders: {str(e)}")
-
-@app.delete("/api/todos/completed")
-async def clear_completed_todos():
-    """
-    Delete all completed todos
-    """
-    try:
-        todos = get_todos()
-        completed_todos = [todo for todo in todos if todo.completed]
-        
-        for todo in completed_todos:
-            delete_todo(todo.id)
-        
-        return {
-            "message": f"Cleared {len(completed_todos)} completed todos",
-            "deleted_count": len(completed_todos)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error clearing completed todos: {str(e)}")
-
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from run import DEFAULT_LOOP
+    uvicorn.run(
+        app, host="0.0.0.0", port=8000,
+        loop=os.getenv("API_LOOP", DEFAULT_LOOP), http=os.getenv("API_HTTP", "httptools"),
+    )
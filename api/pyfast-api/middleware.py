@@ -1,15 +1,22 @@
 """
 Middleware for SpicyTodo API
-Includes request/response logging and error handling
+Includes request/response logging and response compression
 """
 
+import logging
 import time
-from typing import Callable
+from typing import Callable, Iterable
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
 import structlog
 
 logger = structlog.get_logger("api.middleware")
+# Underlying stdlib logger, used for cheap level checks before building log kwargs
+_std_logger = logging.getLogger("api.middleware")
+
+# Load balancer probes; only their failures are worth a log line
+_QUIET_PATHS = ("/health",)
 
 class LoggingMiddleware:
     """Middleware for logging API requests and responses"""
@@ -28,70 +35,74 @@ class LoggingMiddleware:
         method = request.method
         path = request.url.path
         client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Start timing
-        start_time = time.time()
+        # User agent and query params are only worth extracting for debug output
+        verbose = _std_logger.isEnabledFor(logging.DEBUG)
+        user_agent = request.headers.get("user-agent", "unknown") if verbose else None
         
-        # Log request start
-        logger.info(
-            "API request started",
-            method=method,
-            path=path,
-            client_ip=client_ip,
-            user_agent=user_agent,
-            query_params=dict(request.query_params) if request.query_params else None
-        )
+        quiet = path.startswith(_QUIET_PATHS)
         
-        # Process request
-        response_sent = False
-        status_code = 500
+        # Start timing
+        start_time = time.perf_counter()
         
-        async def send_wrapper(message):
-            nonlocal response_sent, status_code
+        # Bind the request fields once; every log line emitted while handling
+        # this request (including from the endpoints) picks them up
+        with structlog.contextvars.bound_contextvars(method=method, path=path, client_ip=client_ip):
+            # Log request start; the query params dict is only built when the line is emitted
+            if not quiet and _std_logger.isEnabledFor(logging.INFO):
+                if verbose:
+                    query_params = request.query_params
+                    logger.info(
+                        "API request started",
+                        user_agent=user_agent,
+                        query_params=dict(query_params) if query_params else None
+                    )
+                else:
+                    logger.info("API request started")
             
-            if message["type"] == "http.response.start":
-                status_code = message["status"]
-                response_sent = True
+            # Process request
+            response_sent = False
+            status_code = 500
+            
+            async def send_wrapper(message):
+                nonlocal response_sent, status_code
                 
-                # Calculate response time
-                response_time = time.time() - start_time
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    response_sent = True
+                    
+                    # Log request completion
+                    if not quiet or status_code >= 400:
+                        log_api_request(
+                            logger=logger,
+                            method=method,
+                            path=path,
+                            status_code=status_code,
+                            response_time=time.perf_counter() - start_time,
+                            user_agent=user_agent,
+                            client_ip=client_ip
+                        )
                 
-                # Log request completion
-                log_api_request(
-                    logger=logger,
-                    method=method,
-                    path=path,
-                    status_code=status_code,
-                    response_time=response_time,
-                    user_agent=user_agent,
-                    client_ip=client_ip
-                )
-            
-            await send(message)
-        
-        try:
-            await self.app(scope, receive, send_wrapper)
-        except Exception as e:
-            # Log error
-            response_time = time.time() - start_time
-            logger.error(
-                "API request failed",
-                method=method,
-                path=path,
-                error=str(e),
-                error_type=type(e).__name__,
-                response_time=response_time,
-                client_ip=client_ip
-            )
+                await send(message)
             
-            # Send error response
-            if not response_sent:
-                error_response = JSONResponse(
-                    status_code=500,
-                    content={"detail": "Internal server error"}
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                # Log error
+                response_time = time.perf_counter() - start_time
+                logger.error(
+                    "API request failed",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                    response_time=response_time
                 )
-                await error_response(scope, receive, send)
+                
+                # Send error response
+                if not response_sent:
+                    error_response = JSONResponse(
+                        status_code=500,
+                        content={"detail": "Internal server error"}
+                    )
+                    await error_response(scope, receive, send)
 
 def log_api_request(
     logger: structlog.BoundLogger,
@@ -129,29 +140,15 @@ def log_api_request(
         **kwargs
     )
 
-class ErrorHandlingMiddleware:
-    """Middleware for global error handling and logging"""
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves the given path prefixes uncompressed"""
     
-    def __init__(self, app):
-        self.app = app
+    def __init__(self, app, exclude_paths: Iterable[str] = (), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exclude_paths = tuple(exclude_paths)
     
     async def __call__(self, scope, receive, send):
-        try:
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_paths):
             await self.app(scope, receive, send)
-        except Exception as e:
-            logger.error(
-                "Unhandled exception in middleware",
-                error=str(e),
-                error_type=type(e).__name__,
-                scope_type=scope.get("type", "unknown")
-            )
-            
-            # Send error response for HTTP requests
-            if scope["type"] == "http":
-                error_response = JSONResponse(
-                    status_code=500,
-                    content={"detail": "Internal server error"}
-                )
-                await error_response(scope, receive, send)
-            else:
-                raise
+            return
+        await super().__call__(scope, receive, send)
@@ -1,13 +1,33 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from typing import List, Optional
 from datetime import datetime, date, time
 from enum import Enum
+from functools import lru_cache
+import time as _time
 
 class Priority(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
 
+@lru_cache(maxsize=1)
+def _today_for_bucket(bucket: int) -> date:
+    return date.today()
+
+def _today() -> date:
+    """Today's date, looked up at most once per second"""
+    return _today_for_bucket(int(_time.time()))
+
+def _check_due_date(v: Optional[date]) -> Optional[date]:
+    if v is not None and v < _today():
+        raise ValueError('Due date cannot be in the past')
+    return v
+
+def _check_reminder_time(v: Optional[time], info: ValidationInfo) -> Optional[time]:
+    if v is not None and 'due_date' in info.data and info.data['due_date'] is None:
+        raise ValueError('Reminder time requires a due date to be set')
+    return v
+
 class TodoBase(BaseModel):
     text: str = Field(..., min_length=1, max_length=500, description="Todo text content")
     priority: Priority = Field(default=Priority.MEDIUM, description="Todo priority level")
@@ -15,17 +35,15 @@ class TodoBase(BaseModel):
     due_date: Optional[date] = Field(None, description="Due date for the todo")
     reminder_time: Optional[time] = Field(None, description="Reminder time for the todo")
 
-    @validator('due_date')
+    @field_validator('due_date')
+    @classmethod
     def validate_due_date(cls, v):
-        if v is not None and v < date.today():
-            raise ValueError('Due date cannot be in the past')
-        return v
+        return _check_due_date(v)
 
-    @validator('reminder_time')
-    def validate_reminder_time(cls, v, values):
-        if v is not None and 'due_date' in values and values['due_date'] is None:
-            raise ValueError('Reminder time requires a due date to be set')
-        return v
+    @field_validator('reminder_time')
+    @classmethod
+    def validate_reminder_time(cls, v, info: ValidationInfo):
+        return _check_reminder_time(v, info)
 
 class TodoCreate(TodoBase):
     """Schema for creating a new todo"""
@@ -39,17 +57,15 @@ class TodoUpdate(BaseModel):
     due_date: Optional[date] = Field(None, description="Updated due date for the todo")
     reminder_time: Optional[time] = Field(None, description="Updated reminder time for the todo")
 
-    @validator('due_date')
+    @field_validator('due_date')
+    @classmethod
     def validate_due_date(cls, v):
-        if v is not None and v < date.today():
-            raise ValueError('Due date cannot be in the past')
-        return v
+        return _check_due_date(v)
 
-    @validator('reminder_time')
-    def validate_reminder_time(cls, v, values):
-        if v is not None and 'due_date' in values and values['due_date'] is None:
-            raise ValueError('Reminder time requires a due date to be set')
-        return v
+    @field_validator('reminder_time')
+    @classmethod
+    def validate_reminder_time(cls, v, info: ValidationInfo):
+        return _check_reminder_time(v, info)
 
 class Todo(TodoBase):
     """Complete todo model with all fields"""
@@ -57,9 +73,19 @@ class Todo(TodoBase):
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
 
-class TodoResponse(Todo):
-    """Response model for API endpoints"""
-    pass
+# Response model for API endpoints; an alias so FastAPI reuses Todo's schema and validator
+TodoResponse = Todo
+
+# Upper bound on todos accepted by one bulk create request
+MAX_BULK_ITEMS = 500
+
+class TodoBulkCreate(BaseModel):
+    """Schema for creating several todos in one request"""
+    items: List[TodoCreate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS, description="Todos to create, in order")
+
+class TodoBulkResponse(BaseModel):
+    """Todos created by a bulk request, in request order"""
+    items: List[TodoResponse] = Field(..., description="Created todos")
 
 class TodoStats(BaseModel):
     """Statistics model for todo summary"""
@@ -1,6 +1,7 @@
+import uuid
 from datetime import datetime, date, time
 
-from sqlalchemy import String, DateTime, Boolean, Date, Time
+from sqlalchemy import String, DateTime, Boolean, Date, Time, Index, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 
 from db import Base
@@ -8,8 +9,14 @@ from db import Base
 
 class TodoORM(Base):
     __tablename__ = "todos"
+    __table_args__ = (
+        # Backs the bulk "clear completed" delete and the status/priority list
+        # filters (the leading column also serves completed-only lookups)
+        Index("ix_todos_completed_priority", "completed", "priority"),
+    )
 
-    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Native UUID on PostgreSQL, 32-char hex on SQLite; the API still exposes ids as strings
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
     text: Mapped[str] = mapped_column(String(500), nullable=False)
     priority: Mapped[str] = mapped_column(String(10), nullable=False, default="medium")
     completed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
@@ -19,3 +26,12 @@ class TodoORM(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
 
+# Partial index for the reminder poll: only open todos with a reminder are
+# indexed, keyed by the due date the poll looks up
+_reminder_predicate = TodoORM.completed.is_(False) & TodoORM.reminder_time.isnot(None)
+Index(
+    "ix_todos_due_reminder",
+    TodoORM.due_date,
+    sqlite_where=_reminder_predicate,
+    postgresql_where=_reminder_predicate,
+)
@@ -6,8 +6,44 @@ Run this script to start the FastAPI development server
 
 import uvicorn
 import os
+import shutil
+import sys
 from dotenv import load_dotenv
 
+# uvloop has no Windows build, so only request the C event loop elsewhere
+DEFAULT_LOOP = "asyncio" if sys.platform == "win32" else "uvloop"
+
+def default_workers(reload: bool) -> int:
+    """
+    Worker processes to start when API_WORKERS / WEB_CONCURRENCY aren't set:
+    2 * cores + 1 with a database, otherwise one. Each worker would keep its
+    own in-memory store, and uvicorn can't combine workers with reload.
+    """
+    if reload or not os.getenv("DATABASE_URL"):
+        return 1
+    return (os.cpu_count() or 1) * 2 + 1
+
+def gunicorn_argv(host: str, port: int, workers: int, log_level: str, access_log: bool) -> list[str]:
+    """
+    Command line for serving through gunicorn's process manager with uvicorn
+    workers (restarts, timeouts, graceful shutdown). UvicornWorker picks
+    uvloop/httptools on its own when they're installed.
+    """
+    argv = [
+        "gunicorn", "main:app",
+        "-k", "uvicorn.workers.UvicornWorker",
+        "-w", str(workers),
+        "--bind", f"{host}:{port}",
+        "--graceful-timeout", "30",
+        "--log-level", log_level,
+    ]
+    # Keep the worker heartbeat file in RAM instead of on (possibly overlay) disk
+    if os.path.isdir("/dev/shm"):
+        argv += ["--worker-tmp-dir", "/dev/shm"]
+    if access_log:
+        argv += ["--access-logfile", "-"]
+    return argv
+
 def main():
     # Load environment variables
     load_dotenv()
@@ -16,20 +52,50 @@ def main():
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", 8000))
     reload = os.getenv("API_RELOAD", "true").lower() == "true"
+    loop = os.getenv("API_LOOP", DEFAULT_LOOP)
+    http = os.getenv("API_HTTP", "httptools")
+    workers = int(os.getenv("API_WORKERS") or os.getenv("WEB_CONCURRENCY") or default_workers(reload))
+    if workers > 1 and not os.getenv("DATABASE_URL"):
+        # Each worker would keep its own in-memory store, so requests would
+        # see different todos depending on which worker served them
+        print(f"⚠️  {workers} workers requested without DATABASE_URL; using 1 (in-memory storage is per process)")
+        workers = 1
+    # Workers inherit the environment; database.py reads this to skip its
+    # per-process read cache when several workers share one database
+    os.environ["API_WORKERS"] = str(workers)
+    # uvicorn's own logging; LoggingMiddleware already logs every request, so
+    # the access log is off by default to skip formatting each line twice
+    log_level = os.getenv("API_LOG_LEVEL", "info").lower()
+    access_log = os.getenv("API_ACCESS_LOG", "false").lower() == "true"
     
     print("🌶️ Starting Spicy Todo API...")
     print(f"📍 Server will be available at: http://{host}:{port}")
     print(f"📚 API Documentation: http://{host}:{port}/docs")
     print(f"🔄 Auto-reload: {'Enabled' if reload else 'Disabled'}")
+    print(f"⚡ Event loop: {loop}, HTTP parser: {http}")
+    print(f"👷 Workers: {workers} (set API_WORKERS or WEB_CONCURRENCY to override)")
+    print(f"📝 Server log level: {log_level}, access log: {'on' if access_log else 'off'}")
     print("-" * 50)
     
+    # Production path: hand the process over to gunicorn when it's installed
+    if not reload and shutil.which("gunicorn"):
+        argv = gunicorn_argv(host, port, workers, log_level, access_log)
+        # exec replaces the process without flushing Python's buffers, which
+        # would drop the banner when stdout is a pipe
+        sys.stdout.flush()
+        os.execvp(argv[0], argv)
+    
     # Start the server
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
         reload=reload,
-        log_level="info"
+        loop=loop,
+        http=http,
+        workers=workers,
+        log_level=log_level,
+        access_log=access_log
     )
 
 if __name__ == "__main__":
@@ -9,47 +9,95 @@ import os
 from pathlib import Path
 
 
-def run_tests():
-    """Run all tests with coverage"""
-    print("🧪 Running Spicy Todo API Tests...")
-    print("=" * 50)
+def _say(*lines):
+    """Write a block of lines with one write (and flush, so it lands before pytest's output)"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def _pytest_env():
+    """Environment for the pytest subprocess (no .pyc writes on cold CI runs)"""
+    return {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+# Collection/startup flags shared by every run: fixed rootdir, no sys.path
+# rewriting per test file, no .pytest_cache writes
+_COLLECT_ARGS = ["--rootdir=.", "--import-mode=importlib", "-p", "no:cacheprovider"]
+
+# Only the application's own modules are measured, not whatever else sits in the dir
+_COV_ARGS = [f"--cov={module}" for module in (
+    "main", "database", "models", "middleware", "logging_config", "db", "orm_models"
+)]
+
+
+def _xdist_args():
+    """pytest-xdist arguments; loadfile keeps each test module on one worker.
+
+    Persistent-storage runs share a single SQLite file, so they default to
+    one worker unless PYTEST_WORKERS says otherwise.
+    """
+    default = "1" if os.getenv("DATABASE_URL") else "auto"
+    return ["-n", os.getenv("PYTEST_WORKERS", default), "--dist=loadfile"]
+
+
+def _run_pytest(cmd):
+    """Run pytest; on CI, write its output to pytest.log and show the tail only on failure"""
+    if not os.getenv("CI"):
+        return subprocess.run(cmd, capture_output=False, env=_pytest_env())
+    log_path = Path("pytest.log")
+    with log_path.open("wb") as log:
+        result = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, env=_pytest_env())
+    if result.returncode != 0:
+        print("\n".join(log_path.read_text(errors="replace").splitlines()[-200:]))
+    return result
+
+
+def run_tests(with_cov=False):
+    """Run all tests; coverage is opt-in via --with-cov or COVERAGE=1"""
+    _say("🧪 Running Spicy Todo API Tests...", "=" * 50)
     
     # Change to the API directory
     api_dir = Path(__file__).parent
     os.chdir(api_dir)
     
+    with_cov = with_cov or os.getenv("COVERAGE") == "1"
+    
     try:
-        # Run pytest with coverage
         cmd = [
             sys.executable, "-m", "pytest",
             "tests/",
-            "--verbose",
-            "--cov=.",
-            "--cov-report=html",
-            "--cov-report=term-missing",
-            "--cov-report=xml",
-            "--cov-fail-under=80",
+            # Quiet output with no live progress repaint unless VERBOSE is set
+            "--verbose" if os.getenv("VERBOSE") else "-q",
+            "-o", "console_output_style=classic",
             "--tb=short"
-        ]
+        ] + _COLLECT_ARGS + _xdist_args()
+        if with_cov:
+            # Line tracing roughly doubles run time, so only pay for it on request
+            cmd += _COV_ARGS + [
+                "--cov-report=html",
+                "--cov-report=term-missing",
+                "--cov-report=xml",
+                "--cov-fail-under=80",
+            ]
         
-        print(f"Running: {' '.join(cmd)}")
-        print()
+        _say(f"Running: {' '.join(cmd)}", "")
         
-        result = subprocess.run(cmd, capture_output=False)
+        result = _run_pytest(cmd)
         
         if result.returncode == 0:
-            print("\n" + "=" * 50)
-            print("🎉 All tests passed!")
-            print("📊 Coverage report generated in htmlcov/index.html")
-            print("📄 Coverage XML report generated in coverage.xml")
+            lines = ["\n" + "=" * 50, "🎉 All tests passed!"]
+            if with_cov:
+                lines += [
+                    "📊 Coverage report generated in htmlcov/index.html",
+                    "📄 Coverage XML report generated in coverage.xml",
+                ]
+            _say(*lines)
         else:
-            print("\n" + "=" * 50)
-            print("❌ Some tests failed!")
+            _say("\n" + "=" * 50, "❌ Some tests failed!")
             sys.exit(1)
             
     except FileNotFoundError:
-        print("❌ pytest not found. Please install test dependencies:")
-        print("   pip install -r requirements.txt")
+        _say("❌ pytest not found. Please install test dependencies:", "   pip install -r requirements.txt")
         sys.exit(1)
     except Exception as e:
         print(f"❌ Error running tests: {e}")
@@ -58,8 +106,7 @@ def run_tests():
 
 def run_specific_test(test_pattern):
     """Run specific tests matching pattern"""
-    print(f"🧪 Running tests matching: {test_pattern}")
-    print("=" * 50)
+    _say(f"🧪 Running tests matching: {test_pattern}", "=" * 50)
     
     api_dir = Path(__file__).parent
     os.chdir(api_dir)
@@ -70,19 +117,16 @@ def run_specific_test(test_pattern):
             f"tests/{test_pattern}",
             "--verbose",
             "--tb=short"
-        ]
+        ] + _COLLECT_ARGS
         
-        print(f"Running: {' '.join(cmd)}")
-        print()
+        _say(f"Running: {' '.join(cmd)}", "")
         
-        result = subprocess.run(cmd, capture_output=False)
+        result = subprocess.run(cmd, capture_output=False, env=_pytest_env())
         
         if result.returncode == 0:
-            print("\n" + "=" * 50)
-            print("🎉 Tests passed!")
+            _say("\n" + "=" * 50, "🎉 Tests passed!")
         else:
-            print("\n" + "=" * 50)
-            print("❌ Tests failed!")
+            _say("\n" + "=" * 50, "❌ Tests failed!")
             sys.exit(1)
             
     except Exception as e:
@@ -92,8 +136,7 @@ def run_specific_test(test_pattern):
 
 def run_coverage_only():
     """Run tests with coverage only (no HTML report)"""
-    print("🧪 Running tests with coverage...")
-    print("=" * 50)
+    _say("🧪 Running tests with coverage...", "=" * 50)
     
     api_dir = Path(__file__).parent
     os.chdir(api_dir)
@@ -102,20 +145,18 @@ def run_coverage_only():
         cmd = [
             sys.executable, "-m", "pytest",
             "tests/",
-            "--cov=.",
+            *_COV_ARGS,
             "--cov-report=term-missing",
             "--cov-fail-under=80",
             "--tb=short"
-        ]
+        ] + _COLLECT_ARGS + _xdist_args()
         
-        result = subprocess.run(cmd, capture_output=False)
+        result = _run_pytest(cmd)
         
         if result.returncode == 0:
-            print("\n" + "=" * 50)
-            print("🎉 All tests passed!")
+            _say("\n" + "=" * 50, "🎉 All tests passed!")
         else:
-            print("\n" + "=" * 50)
-            print("❌ Some tests failed!")
+            _say("\n" + "=" * 50, "❌ Some tests failed!")
             sys.exit(1)
             
     except Exception as e:
@@ -125,14 +166,19 @@ def run_coverage_only():
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        if sys.argv[1] == "--coverage-only":
+        if sys.argv[1] == "--with-cov":
+            run_tests(with_cov=True)
+        elif sys.argv[1] == "--coverage-only":
             run_coverage_only()
         elif sys.argv[1] == "--help":
-            print("Usage:")
-            print("  python run_tests.py                    # Run all tests with full coverage")
-            print("  python run_tests.py --coverage-only     # Run tests with terminal coverage only")
-            print("  python run_tests.py test_pattern        # Run specific tests")
-            print("  python run_tests.py --help              # Show this help")
+            _say(
+                "Usage:",
+                "  python run_tests.py                    # Run all tests (COVERAGE=1 enables coverage)",
+                "  python run_tests.py --with-cov          # Run all tests with full coverage",
+                "  python run_tests.py --coverage-only     # Run tests with terminal coverage only",
+                "  python run_tests.py test_pattern        # Run specific tests",
+                "  python run_tests.py --help              # Show this help",
+            )
         else:
             run_specific_test(sys.argv[1])
     else:
@@ -4,124 +4,152 @@ Simple test script for the Spicy Todo API
 Run this to test basic API functionality
 """
 
-import requests
-import json
-import time
+import asyncio
+import io
+import sys
+import httpx
+import orjson
 
 API_BASE_URL = "http://localhost:8000"
+JSON_HEADERS = {"Content-Type": "application/json"}
 
-def test_api():
-    print("🧪 Testing Spicy Todo API...")
-    print("=" * 50)
+# Request bodies are serialized once at import and sent as raw bytes
+NEW_TODO_BODY = orjson.dumps({
+    "text": "Test todo from API test script",
+    "priority": "high",
+    "completed": False
+})
+UPDATE_TODO_BODY = orjson.dumps({"completed": True})
+
+async def _update_then_toggle(client, todo_id):
+    """Steps 5 and 6 both write the same todo, so they stay ordered"""
+    updated = await client.put(f"/api/todos/{todo_id}", content=UPDATE_TODO_BODY)
+    toggled = await client.patch(f"/api/todos/{todo_id}/toggle")
+    return updated, toggled
+
+async def test_api():
+    # Collect the report in memory and write it out once at the end (or on
+    # the early-return/error paths) instead of one stdout write per line
+    out = io.StringIO()
+    def emit(*args):
+        print(*args, file=out)
     
+    emit("🧪 Testing Spicy Todo API...")
+    emit("=" * 50)
+
+    # One pooled keep-alive client for every call; the independent checks
+    # after the create step are issued concurrently over it
+    limits = httpx.Limits(max_keepalive_connections=10)
     try:
-        # Test 1: Health check
-        print("1. Testing health check...")
-        response = requests.get(f"{API_BASE_URL}/health")
-        if response.status_code == 200:
-            print("✅ Health check passed")
-            print(f"   Response: {response.json()}")
-        else:
-            print(f"❌ Health check failed: {response.status_code}")
-            return
-        
-        # Test 2: Get all todos
-        print("\n2. Testing get all todos...")
-        response = requests.get(f"{API_BASE_URL}/api/todos")
-        if response.status_code == 200:
-            todos = response.json()
-            print(f"✅ Retrieved {len(todos)} todos")
-            if todos:
-                print(f"   First todo: {todos[0]['text'][:50]}...")
-        else:
-            print(f"❌ Get todos failed: {response.status_code}")
-            return
-        
-        # Test 3: Create a new todo
-        print("\n3. Testing create todo...")
-        new_todo = {
-            "text": "Test todo from API test script",
-            "priority": "high",
-            "completed": False
-        }
-        response = requests.post(f"{API_BASE_URL}/api/todos", json=new_todo)
-        if response.status_code == 200:
-            created_todo = response.json()
-            print("✅ Todo created successfully")
-            print(f"   ID: {created_todo['id']}")
-            todo_id = created_todo['id']
-        else:
-            print(f"❌ Create todo failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return
-        
-        # Test 4: Get specific todo
-        print("\n4. Testing get specific todo...")
-        response = requests.get(f"{API_BASE_URL}/api/todos/{todo_id}")
-        if response.status_code == 200:
-            todo = response.json()
-            print("✅ Retrieved specific todo")
-            print(f"   Text: {todo['text']}")
-        else:
-            print(f"❌ Get specific todo failed: {response.status_code}")
-        
-        # Test 5: Update todo
-        print("\n5. Testing update todo...")
-        update_data = {"completed": True}
-        response = requests.put(f"{API_BASE_URL}/api/todos/{todo_id}", json=update_data)
-        if response.status_code == 200:
-            updated_todo = response.json()
-            print("✅ Todo updated successfully")
-            print(f"   Completed: {updated_todo['completed']}")
-        else:
-            print(f"❌ Update todo failed: {response.status_code}")
-        
-        # Test 6: Toggle todo
-        print("\n6. Testing toggle todo...")
-        response = requests.patch(f"{API_BASE_URL}/api/todos/{todo_id}/toggle")
-        if response.status_code == 200:
-            toggled_todo = response.json()
-            print("✅ Todo toggled successfully")
-            print(f"   Completed: {toggled_todo['completed']}")
-        else:
-            print(f"❌ Toggle todo failed: {response.status_code}")
-        
-        # Test 7: Search todos
-        print("\n7. Testing search todos...")
-        response = requests.get(f"{API_BASE_URL}/api/todos?search=test")
-        if response.status_code == 200:
-            search_results = response.json()
-            print(f"✅ Search completed: {len(search_results)} results")
-        else:
-            print(f"❌ Search failed: {response.status_code}")
-        
-        # Test 8: Get statistics
-        print("\n8. Testing get statistics...")
-        response = requests.get(f"{API_BASE_URL}/api/todos/stats/summary")
-        if response.status_code == 200:
-            stats = response.json()
-            print("✅ Statistics retrieved")
-            print(f"   Total: {stats['total']}, Active: {stats['active']}, Completed: {stats['completed']}")
-        else:
-            print(f"❌ Get statistics failed: {response.status_code}")
-        
-        # Test 9: Delete todo
-        print("\n9. Testing delete todo...")
-        response = requests.delete(f"{API_BASE_URL}/api/todos/{todo_id}")
-        if response.status_code == 200:
-            print("✅ Todo deleted successfully")
-        else:
-            print(f"❌ Delete todo failed: {response.status_code}")
-        
-        print("\n" + "=" * 50)
-        print("🎉 All tests completed!")
-        
-    except requests.exceptions.ConnectionError:
-        print("❌ Could not connect to the API server.")
-        print("   Make sure the server is running on http://localhost:8000")
-        print("   Run: python main.py")
+        async with httpx.AsyncClient(
+            base_url=API_BASE_URL, http2=False, limits=limits, headers=JSON_HEADERS
+        ) as client:
+            # Test 1: Health check
+            emit("1. Testing health check...")
+            response = await client.get("/health")
+            if response.status_code == 200:
+                emit("✅ Health check passed")
+                emit(f"   Response: {orjson.loads(response.content)}")
+            else:
+                emit(f"❌ Health check failed: {response.status_code}")
+                return
+
+            # Test 2: Get all todos
+            emit("\n2. Testing get all todos...")
+            response = await client.get("/api/todos")
+            if response.status_code == 200:
+                todos = orjson.loads(response.content)
+                emit(f"✅ Retrieved {len(todos)} todos")
+                if todos:
+                    emit(f"   First todo: {todos[0]['text'][:50]}...")
+            else:
+                emit(f"❌ Get todos failed: {response.status_code}")
+                return
+
+            # Test 3: Create a new todo
+            emit("\n3. Testing create todo...")
+            response = await client.post("/api/todos", content=NEW_TODO_BODY)
+            if response.status_code == 200:
+                created_todo = orjson.loads(response.content)
+                emit("✅ Todo created successfully")
+                emit(f"   ID: {created_todo['id']}")
+                todo_id = created_todo['id']
+            else:
+                emit(f"❌ Create todo failed: {response.status_code}")
+                emit(f"   Response: {response.text}")
+                return
+
+            # Tests 4-8 only need the created todo, so run them concurrently
+            get_response, (update_response, toggle_response), search_response, stats_response = await asyncio.gather(
+                client.get(f"/api/todos/{todo_id}"),
+                _update_then_toggle(client, todo_id),
+                client.get("/api/todos", params={"search": "test"}),
+                client.get("/api/todos/stats/summary"),
+            )
+
+            # Test 4: Get specific todo
+            emit("\n4. Testing get specific todo...")
+            if get_response.status_code == 200:
+                todo = orjson.loads(get_response.content)
+                emit("✅ Retrieved specific todo")
+                emit(f"   Text: {todo['text']}")
+            else:
+                emit(f"❌ Get specific todo failed: {get_response.status_code}")
+
+            # Test 5: Update todo
+            emit("\n5. Testing update todo...")
+            if update_response.status_code == 200:
+                updated_todo = orjson.loads(update_response.content)
+                emit("✅ Todo updated successfully")
+                emit(f"   Completed: {updated_todo['completed']}")
+            else:
+                emit(f"❌ Update todo failed: {update_response.status_code}")
+
+            # Test 6: Toggle todo
+            emit("\n6. Testing toggle todo...")
+            if toggle_response.status_code == 200:
+                toggled_todo = orjson.loads(toggle_response.content)
+                emit("✅ Todo toggled successfully")
+                emit(f"   Completed: {toggled_todo['completed']}")
+            else:
+                emit(f"❌ Toggle todo failed: {toggle_response.status_code}")
+
+            # Test 7: Search todos
+            emit("\n7. Testing search todos...")
+            if search_response.status_code == 200:
+                search_results = orjson.loads(search_response.content)
+                emit(f"✅ Search completed: {len(search_results)} results")
+            else:
+                emit(f"❌ Search failed: {search_response.status_code}")
+
+            # Test 8: Get statistics
+            emit("\n8. Testing get statistics...")
+            if stats_response.status_code == 200:
+                stats = orjson.loads(stats_response.content)
+                emit("✅ Statistics retrieved")
+                emit(f"   Total: {stats['total']}, Active: {stats['active']}, Completed: {stats['completed']}")
+            else:
+                emit(f"❌ Get statistics failed: {stats_response.status_code}")
+
+            # Test 9: Delete todo
+            emit("\n9. Testing delete todo...")
+            response = await client.delete(f"/api/todos/{todo_id}")
+            if response.status_code == 200:
+                emit("✅ Todo deleted successfully")
+            else:
+                emit(f"❌ Delete todo failed: {response.status_code}")
+
+            emit("\n" + "=" * 50)
+            emit("🎉 All tests completed!")
+
+    except httpx.ConnectError:
+        emit("❌ Could not connect to the API server.")
+        emit("   Make sure the server is running on http://localhost:8000")
+        emit("   Run: python main.py")
     except Exception as e:
-        print(f"❌ Test failed with error: {e}")
+        emit(f"❌ Test failed with error: {e}")
+    finally:
+        sys.stdout.write(out.getvalue())
 
 if __name__ == "__main__":
-    test_api()
+    asyncio.run(test_api())
@@ -2,15 +2,39 @@
 Pytest configuration and fixtures for the Spicy Todo API tests
 """
 
+import asyncio
 import pytest
+import pytest_asyncio
+import httpx
+import orjson
 import os
 from fastapi.testclient import TestClient
 from datetime import datetime
 import uuid
 from main import app
-from database import _todos_db, initialize_sample_data, clear_completed_todos, _use_persistent_storage
+from database import _todos, _invalidate_reads, initialize_sample_data, clear_completed_todos, _use_persistent_storage
 from models import Todo, TodoCreate, TodoUpdate, Priority
 
+# Fixed sample data: stable, unique ids and timestamps without urandom/clock calls
+_SAMPLE_IDS = (
+    "11111111-1111-1111-1111-111111111111",
+    "22222222-2222-2222-2222-222222222222",
+    "33333333-3333-3333-3333-333333333333",
+)
+_SAMPLE_TIMESTAMP = datetime(2024, 1, 1)
+# A valid UUID that no test ever stores, for "not found" lookups
+_MISSING_ID = "00000000-0000-4000-8000-000000000000"
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "concurrent: sends overlapping requests; gets its own database with persistent storage"
+    )
+
+
+def _is_concurrent(request):
+    return request.node.get_closest_marker("concurrent") is not None
+
+
 # Ensure tests run with in-memory storage by default
 # This prevents tests from accidentally using persistent storage
 @pytest.fixture(autouse=True, scope="session")
@@ -24,82 +48,222 @@ def setup_test_environment():
     # (This is handled by the test runner)
 
 
-@pytest.fixture(scope="function")
+# The app clients skip gzip: compressing and then inflating every larger
+# response is pure overhead in-process (the gzip middleware has its own tests)
+_CLIENT_HEADERS = {"Accept-Encoding": "identity"}
+
+
+class OrjsonTestClient(TestClient):
+    """TestClient that encodes json= request bodies with orjson instead of the stdlib"""
+    
+    def request(self, method, url, *, json=None, **kwargs):
+        if json is not None:
+            headers = httpx.Headers(kwargs.pop("headers", None))
+            headers.setdefault("content-type", "application/json")
+            kwargs["content"] = orjson.dumps(json)
+            kwargs["headers"] = headers
+        return super().request(method, url, **kwargs)
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+    """Create one test client for the FastAPI app, shared by the whole session.
+
+    The app holds no per-test state (clean_database resets the store), so
+    startup/shutdown only needs to run once per session (or xdist worker).
+    """
+    with OrjsonTestClient(app, headers=_CLIENT_HEADERS) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole session, so session-scoped async fixtures can share it"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client():
+    """Async client calling the app in-process, for firing independent requests concurrently.
+
+    Like the sync client it holds no per-test state, so one is shared by the session.
+    """
+    async with httpx.AsyncClient(app=app, base_url="http://test", headers=_CLIENT_HEADERS) as c:
+        yield c
+
+
+def _wipe_todos(db):
+    """Empty the todos table (TRUNCATE where supported, DELETE on SQLite)"""
+    from sqlalchemy import delete, text
+    from orm_models import TodoORM
+    
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"TRUNCATE {TodoORM.__tablename__}"))
+    else:
+        db.execute(delete(TodoORM))
+    db.commit()
+
+
+def _begin_outer_transaction(connection):
+    """Open the session-wide transaction on an empty table (the wipe is undone with it)"""
+    from db import SessionLocal
+    
+    connection.begin()
+    with SessionLocal() as db:
+        _wipe_todos(db)
+
+
+@pytest.fixture(scope="session")
+def db_connection():
+    """
+    One connection holding an outer transaction for the whole session (None
+    with in-memory storage). Every SessionLocal() - the app's included -
+    joins it through a SAVEPOINT, so nothing a test writes is ever committed
+    (concurrent tests are pointed at a scratch database instead).
+    """
+    if not _use_persistent_storage():
+        yield None
+        return
+    from db import engine, SessionLocal
+    
+    connection = engine.connect()
+    SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    _begin_outer_transaction(connection)
+    yield connection
+    SessionLocal.configure(bind=engine, join_transaction_mode="conditional_savepoint")
+    connection.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def db_session(db_connection):
+    """One DB session shared by the data fixtures (None with in-memory storage)"""
+    if db_connection is None:
+        yield None
+        return
+    from db import SessionLocal
+    
+    with SessionLocal() as db:
+        yield db
+
+
+def _scratch_database(path, connection):
+    """
+    Point SessionLocal at a fresh SQLite file for one test, then back at the
+    shared connection. Sessions there each check out their own connection
+    and really commit, so requests can run on several threads at once.
+    """
+    from sqlalchemy import create_engine
+    from db import Base, SessionLocal
+    
+    scratch = create_engine(f"sqlite:///{path / 'todos.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=scratch)
+    SessionLocal.configure(bind=scratch, join_transaction_mode="conditional_savepoint")
+    _invalidate_reads()
+    try:
+        yield
+    finally:
+        SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+        _invalidate_reads()
+        scratch.dispose()
 
 
 @pytest.fixture(scope="function")
-def clean_database():
+def clean_database(request, db_connection):
     """Clean the database before each test"""
-    if _use_persistent_storage():
-        # For persistent storage, we need to clear the database tables
-        from db import engine, get_db_session
-        from orm_models import TodoORM
-        from sqlalchemy import delete
-        
-        with next(get_db_session()) as db:
-            db.execute(delete(TodoORM))
-            db.commit()
+    if _use_persistent_storage() and _is_concurrent(request):
+        # A Connection must not be used from several threads at once, so
+        # concurrent tests can't share db_connection; the file is discarded
+        # with tmp_path afterwards
+        yield from _scratch_database(request.getfixturevalue("tmp_path"), db_connection)
+    elif _use_persistent_storage():
+        # For persistent storage, each test runs inside a SAVEPOINT that is
+        # rolled back afterwards, so no rows are ever deleted
+        savepoint = db_connection.begin_nested()
+        _invalidate_reads()
         yield
-        # Clean up after test
-        with next(get_db_session()) as db:
-            db.execute(delete(TodoORM))
-            db.commit()
+        savepoint.rollback()
+        _invalidate_reads()
     else:
         # For in-memory storage, use the existing approach
-        global _todos_db
-        _todos_db.clear()
+        global _todos
+        _todos.clear()
+        _invalidate_reads()
         yield
-        _todos_db.clear()
+        _todos.clear()
+        _invalidate_reads()
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_todos():
-    """Create sample todos for testing"""
-    todos = []
-    for i in range(3):
-        todo = Todo(
-            id=str(uuid.uuid4()),
+    """Create sample todos for testing (built once; populated_database copies them)"""
+    # Trusted, fixed data: model_construct skips the validator chain
+    return tuple(
+        Todo.model_construct(
+            id=_SAMPLE_IDS[i],
             text=f"Test todo {i+1}",
             priority=Priority.MEDIUM,
             completed=i % 2 == 0,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+            created_at=_SAMPLE_TIMESTAMP,
+            updated_at=_SAMPLE_TIMESTAMP
         )
-        todos.append(todo)
-    return todos
+        for i in range(len(_SAMPLE_IDS))
+    )
 
 
 @pytest.fixture(scope="function")
-def populated_database(sample_todos):
+def populated_database(request, clean_database, db_session, sample_todos):
     """Populate the database with sample todos"""
+    # Copies, so a test can't mutate the session-scoped originals
+    sample_todos = [todo.model_copy() for todo in sample_todos]
     if _use_persistent_storage():
         # For persistent storage, insert into database
-        from db import get_db_session
         from orm_models import TodoORM
+        from sqlalchemy import insert
+        from db import SessionLocal
         
-        with next(get_db_session()) as db:
-            for todo in sample_todos:
-                db_todo = TodoORM(
-                    id=todo.id,
-                    text=todo.text,
-                    priority=todo.priority.value,
-                    completed=todo.completed,
-                    created_at=todo.created_at,
-                    updated_at=todo.updated_at
-                )
-                db.add(db_todo)
-            db.commit()
+        # db_session is bound to the shared connection; concurrent tests
+        # write to their scratch database instead (see clean_database)
+        db = SessionLocal() if _is_concurrent(request) else db_session
+        # One executemany INSERT through Core, bypassing the ORM unit of work
+        db.execute(insert(TodoORM), [
+            {
+                "id": uuid.UUID(todo.id),
+                "text": todo.text,
+                "priority": todo.priority.value,
+                "completed": todo.completed,
+                "created_at": todo.created_at,
+                "updated_at": todo.updated_at,
+            }
+            for todo in sample_todos
+        ])
+        db.commit()
+        if db is not db_session:
+            db.close()
+        _invalidate_reads()
         return sample_todos
     else:
         # For in-memory storage, use the existing approach
-        global _todos_db
-        _todos_db.extend(sample_todos)
+        global _todos
+        _todos.update((todo.id, todo) for todo in sample_todos)
+        _invalidate_reads()
         return sample_todos
 
 
+@pytest.fixture(scope="function")
+def first_todo_id(populated_database):
+    """Id of the first seeded todo, for tests that only need one existing id"""
+    return populated_database[0].id
+
+
+@pytest.fixture(scope="session")
+def missing_id():
+    """Id that matches no todo, for "not found" tests"""
+    return _MISSING_ID
+
+
 @pytest.fixture
 def todo_create_data():
     """Sample todo creation data"""
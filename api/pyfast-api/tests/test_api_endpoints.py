@@ -3,10 +3,40 @@ Tests for API endpoints and HTTP methods
 """
 
 import pytest
+import asyncio
+import orjson
 from fastapi.testclient import TestClient
 from datetime import datetime
-import uuid
-from models import Priority
+from models import Priority, MAX_BULK_ITEMS
+
+# Fields every serialized todo carries
+_TODO_FIELDS = frozenset({"id", "text", "priority", "completed", "created_at", "updated_at"})
+
+# Fields and priority buckets every stats summary carries
+_STATS_FIELDS = frozenset({"total", "active", "completed", "completion_rate", "priority_breakdown"})
+_PRIORITY_KEYS = frozenset({"high", "medium", "low"})
+
+# Create payloads serialized once and posted as raw bytes
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_NEW_TODO_BODY = orjson.dumps({"text": "New test todo", "priority": "high", "completed": False})
+_MINIMAL_TODO_BODY = orjson.dumps({"text": "Minimal todo"})
+
+# Flat, fixed error bodies are compared as bytes rather than parsed
+_NOT_FOUND_BODY = b'{"detail":"Todo not found"}'
+
+# Rejected create payloads, built once at import
+_OVERLONG_TEXT = "x" * 501  # one past the 500-char limit
+_EMPTY_TEXT_PAYLOAD = {"text": "", "priority": "invalid_priority", "completed": "not_a_boolean"}
+_MISSING_TEXT_PAYLOAD = {"priority": "high"}
+_OVERLONG_TEXT_PAYLOAD = {"text": _OVERLONG_TEXT, "priority": "medium"}
+
+
+def _assert_stats_shape(stats):
+    """Check the invariants every stats summary must satisfy"""
+    assert stats.keys() >= _STATS_FIELDS
+    assert stats["active"] + stats["completed"] == stats["total"]
+    assert isinstance(stats["completion_rate"], (int, float))
+    assert stats["priority_breakdown"].keys() >= _PRIORITY_KEYS
 
 
 class TestRootEndpoint:
@@ -58,66 +88,25 @@ class TestGetTodosEndpoint:
         todos = response.json()
         assert len(todos) > 0  # Should auto-initialize
     
-    def test_get_todos_filter_active(self, client, populated_database):
-        """Test filtering for active todos"""
-        response = client.get("/api/todos?filter=active")
+    @pytest.mark.parametrize("query,predicate,expected_count", [
+        ("filter=active", lambda todo: not todo["completed"], None),
+        ("filter=completed", lambda todo: todo["completed"], None),
+        ("filter=all", lambda todo: True, 3),
+        ("filter=invalid", lambda todo: True, 3),  # unknown filter returns all todos
+        ("search=test", lambda todo: "test" in todo["text"].lower(), None),
+        ("search=TEST", lambda todo: "test" in todo["text"].lower(), None),  # case-insensitive
+        ("priority=medium", lambda todo: todo["priority"] == "medium", None),
+    ], ids=["active", "completed", "all", "invalid_filter", "search", "search_case_insensitive", "priority"])
+    def test_get_todos_filter(self, client, populated_database, query, predicate, expected_count):
+        """Test each filter/search/priority query returns only matching todos"""
+        response = client.get(f"/api/todos?{query}")
         
         assert response.status_code == 200
         todos = response.json()
         
-        # All returned todos should be active (not completed)
-        for todo in todos:
-            assert not todo["completed"]
-    
-    def test_get_todos_filter_completed(self, client, populated_database):
-        """Test filtering for completed todos"""
-        response = client.get("/api/todos?filter=completed")
-        
-        assert response.status_code == 200
-        todos = response.json()
-        
-        # All returned todos should be completed
-        for todo in todos:
-            assert todo["completed"]
-    
-    def test_get_todos_filter_all(self, client, populated_database):
-        """Test filtering for all todos"""
-        response = client.get("/api/todos?filter=all")
-        
-        assert response.status_code == 200
-        todos = response.json()
-        assert len(todos) == 3
-    
-    def test_get_todos_search(self, client, populated_database):
-        """Test searching todos by text"""
-        response = client.get("/api/todos?search=test")
-        
-        assert response.status_code == 200
-        todos = response.json()
-        
-        # All returned todos should contain "test" in their text
-        for todo in todos:
-            assert "test" in todo["text"].lower()
-    
-    def test_get_todos_search_case_insensitive(self, client, populated_database):
-        """Test case-insensitive search"""
-        response = client.get("/api/todos?search=TEST")
-        
-        assert response.status_code == 200
-        todos = response.json()
-        
-        for todo in todos:
-            assert "test" in todo["text"].lower()
-    
-    def test_get_todos_priority_filter(self, client, populated_database):
-        """Test filtering by priority"""
-        response = client.get("/api/todos?priority=medium")
-        
-        assert response.status_code == 200
-        todos = response.json()
-        
-        for todo in todos:
-            assert todo["priority"] == "medium"
+        assert all(predicate(todo) for todo in todos)
+        if expected_count is not None:
+            assert len(todos) == expected_count
     
     def test_get_todos_multiple_filters(self, client, populated_database):
         """Test multiple filters combined"""
@@ -126,52 +115,45 @@ class TestGetTodosEndpoint:
         assert response.status_code == 200
         todos = response.json()
         
-        for todo in todos:
-            assert not todo["completed"]  # active filter
-            assert "test" in todo["text"].lower()  # search filter
-            assert todo["priority"] == "medium"  # priority filter
+        assert all(
+            not todo["completed"]  # active filter
+            and "test" in todo["text"].lower()  # search filter
+            and todo["priority"] == "medium"  # priority filter
+            for todo in todos
+        )
     
-    def test_get_todos_invalid_filter(self, client, populated_database):
-        """Test with invalid filter value"""
-        response = client.get("/api/todos?filter=invalid")
+    def test_get_todos_invalid_priority(self, client, populated_database):
+        """Test that an unknown priority is rejected before querying"""
+        response = client.get("/api/todos?priority=urgent")
         
-        assert response.status_code == 200
-        todos = response.json()
-        assert len(todos) == 3  # Should return all todos
+        assert response.status_code == 422
 
 
 class TestGetTodoEndpoint:
     """Test GET /api/todos/{todo_id} endpoint"""
     
-    def test_get_todo_existing(self, client, populated_database):
+    def test_get_todo_existing(self, client, first_todo_id):
         """Test getting existing todo by ID"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        
-        response = client.get(f"/api/todos/{todo_id}")
+        response = client.get(f"/api/todos/{first_todo_id}")
         
         assert response.status_code == 200
         todo = response.json()
-        assert todo["id"] == todo_id
+        assert todo["id"] == first_todo_id
         assert todo["text"] == "Test todo 1"
     
-    def test_get_todo_nonexistent(self, client, populated_database):
+    def test_get_todo_nonexistent(self, client, populated_database, missing_id):
         """Test getting non-existent todo by ID"""
-        fake_id = str(uuid.uuid4())
-        
-        response = client.get(f"/api/todos/{fake_id}")
+        response = client.get(f"/api/todos/{missing_id}")
         
         assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Todo not found"
+        assert response.content == _NOT_FOUND_BODY
     
     def test_get_todo_invalid_id_format(self, client, populated_database):
         """Test getting todo with invalid ID format"""
         response = client.get("/api/todos/invalid-id")
         
         assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Todo not found"
+        assert response.content == _NOT_FOUND_BODY
 
 
 class TestCreateTodoEndpoint:
@@ -179,28 +161,18 @@ class TestCreateTodoEndpoint:
     
     def test_create_todo_valid(self, client, clean_database):
         """Test creating a valid todo"""
-        todo_data = {
-            "text": "New test todo",
-            "priority": "high",
-            "completed": False
-        }
-        
-        response = client.post("/api/todos", json=todo_data)
+        response = client.post("/api/todos", content=_NEW_TODO_BODY, headers=_JSON_HEADERS)
         
         assert response.status_code == 200
         created_todo = response.json()
         assert created_todo["text"] == "New test todo"
         assert created_todo["priority"] == "high"
         assert created_todo["completed"] is False
-        assert "id" in created_todo
-        assert "created_at" in created_todo
-        assert "updated_at" in created_todo
+        assert created_todo.keys() >= _TODO_FIELDS
     
     def test_create_todo_minimal(self, client, clean_database):
         """Test creating todo with minimal data"""
-        todo_data = {"text": "Minimal todo"}
-        
-        response = client.post("/api/todos", json=todo_data)
+        response = client.post("/api/todos", content=_MINIMAL_TODO_BODY, headers=_JSON_HEADERS)
         
         assert response.status_code == 200
         created_todo = response.json()
@@ -208,66 +180,73 @@ class TestCreateTodoEndpoint:
         assert created_todo["priority"] == "medium"  # default
         assert created_todo["completed"] is False  # default
     
-    def test_create_todo_invalid_data(self, client, clean_database):
-        """Test creating todo with invalid data"""
-        invalid_data = {
-            "text": "",  # Empty text should fail
-            "priority": "invalid_priority",
-            "completed": "not_a_boolean"
-        }
-        
-        response = client.post("/api/todos", json=invalid_data)
-        
-        assert response.status_code == 422  # Validation error
+    @pytest.mark.parametrize("payload,expected_status", [
+        # Empty text, unknown priority and a non-boolean completed flag
+        (_EMPTY_TEXT_PAYLOAD, 422),
+        # Required text field missing
+        (_MISSING_TEXT_PAYLOAD, 422),
+        # Text exceeds max length
+        (_OVERLONG_TEXT_PAYLOAD, 422),
+    ], ids=["invalid_data", "missing_text", "text_too_long"])
+    def test_create_todo_invalid(self, client, clean_database, payload, expected_status):
+        """Test creating todo with invalid data is rejected"""
+        response = client.post("/api/todos", json=payload)
+        
+        assert response.status_code == expected_status
+
+
+class TestBulkCreateEndpoint:
+    """Test POST /api/todos/bulk endpoint"""
     
-    def test_create_todo_missing_text(self, client, clean_database):
-        """Test creating todo without required text field"""
-        invalid_data = {"priority": "high"}
+    def test_create_todos_bulk(self, client, populated_database):
+        """Test creating several todos in one request"""
+        items = [{"text": f"Bulk todo {i}", "priority": "low"} for i in range(3)]
         
-        response = client.post("/api/todos", json=invalid_data)
+        response = client.post("/api/todos/bulk", json={"items": items})
         
-        assert response.status_code == 422
-    
-    def test_create_todo_text_too_long(self, client, clean_database):
-        """Test creating todo with text too long"""
-        invalid_data = {
-            "text": "x" * 501,  # Exceeds max length
-            "priority": "medium"
-        }
-        
-        response = client.post("/api/todos", json=invalid_data)
+        assert response.status_code == 200
+        created = response.json()["items"]
+        assert [todo["text"] for todo in created] == ["Bulk todo 0", "Bulk todo 1", "Bulk todo 2"]
+        assert all(todo.keys() >= _TODO_FIELDS for todo in created)
+        assert len(client.get("/api/todos").json()) == len(populated_database) + 3
+    
+    @pytest.mark.parametrize("payload", [
+        {"items": []},
+        {"items": [{"text": "Valid"}, _MISSING_TEXT_PAYLOAD]},
+        {"items": [{"text": "x"}] * (MAX_BULK_ITEMS + 1)},
+    ], ids=["empty", "one_invalid_item", "too_many_items"])
+    def test_create_todos_bulk_invalid(self, client, populated_database, payload):
+        """Test invalid batches are rejected whole"""
+        response = client.post("/api/todos/bulk", json=payload)
         
         assert response.status_code == 422
+        assert len(client.get("/api/todos").json()) == len(populated_database)
 
 
 class TestUpdateTodoEndpoint:
     """Test PUT /api/todos/{todo_id} endpoint"""
     
-    def test_update_todo_existing(self, client, populated_database):
+    def test_update_todo_existing(self, client, first_todo_id):
         """Test updating existing todo"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        
         update_data = {
             "text": "Updated text",
             "priority": "high",
             "completed": True
         }
         
-        response = client.put(f"/api/todos/{todo_id}", json=update_data)
+        response = client.put(f"/api/todos/{first_todo_id}", json=update_data)
         
         assert response.status_code == 200
         updated_todo = response.json()
         assert updated_todo["text"] == "Updated text"
         assert updated_todo["priority"] == "high"
         assert updated_todo["completed"] is True
-        assert updated_todo["id"] == todo_id
+        assert updated_todo["id"] == first_todo_id
     
     def test_update_todo_partial(self, client, populated_database):
         """Test partial update of todo"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        original_priority = todos[0]["priority"]
+        todo_id = populated_database[0].id
+        original_priority = populated_database[0].priority.value
         
         update_data = {"text": "Only text updated"}
         
@@ -278,28 +257,23 @@ class TestUpdateTodoEndpoint:
         assert updated_todo["text"] == "Only text updated"
         assert updated_todo["priority"] == original_priority  # Should remain unchanged
     
-    def test_update_todo_nonexistent(self, client, populated_database):
+    def test_update_todo_nonexistent(self, client, populated_database, missing_id):
         """Test updating non-existent todo"""
-        fake_id = str(uuid.uuid4())
         update_data = {"text": "This should fail"}
         
-        response = client.put(f"/api/todos/{fake_id}", json=update_data)
+        response = client.put(f"/api/todos/{missing_id}", json=update_data)
         
         assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Todo not found"
+        assert response.content == _NOT_FOUND_BODY
     
-    def test_update_todo_invalid_data(self, client, populated_database):
+    def test_update_todo_invalid_data(self, client, first_todo_id):
         """Test updating with invalid data"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        
         invalid_data = {
             "text": "",  # Empty text should fail
             "priority": "invalid_priority"
         }
         
-        response = client.put(f"/api/todos/{todo_id}", json=invalid_data)
+        response = client.put(f"/api/todos/{first_todo_id}", json=invalid_data)
         
         assert response.status_code == 422
 
@@ -309,29 +283,24 @@ class TestDeleteTodoEndpoint:
     
     def test_delete_todo_existing(self, client, populated_database):
         """Test deleting existing todo"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        initial_count = len(todos)
+        todo_id = populated_database[0].id
+        initial_count = len(populated_database)
         
         response = client.delete(f"/api/todos/{todo_id}")
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Todo deleted successfully"
+        assert response.content == b'{"message":"Todo deleted successfully"}'
         
         # Verify todo is deleted
         remaining_todos = client.get("/api/todos").json()
         assert len(remaining_todos) == initial_count - 1
     
-    def test_delete_todo_nonexistent(self, client, populated_database):
+    def test_delete_todo_nonexistent(self, client, populated_database, missing_id):
         """Test deleting non-existent todo"""
-        fake_id = str(uuid.uuid4())
-        
-        response = client.delete(f"/api/todos/{fake_id}")
+        response = client.delete(f"/api/todos/{missing_id}")
         
         assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Todo not found"
+        assert response.content == _NOT_FOUND_BODY
 
 
 class TestToggleTodoEndpoint:
@@ -339,9 +308,8 @@ class TestToggleTodoEndpoint:
     
     def test_toggle_todo_existing(self, client, populated_database):
         """Test toggling existing todo"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        original_completed = todos[0]["completed"]
+        todo_id = populated_database[0].id
+        original_completed = populated_database[0].completed
         
         response = client.patch(f"/api/todos/{todo_id}/toggle")
         
@@ -350,15 +318,12 @@ class TestToggleTodoEndpoint:
         assert toggled_todo["completed"] != original_completed
         assert toggled_todo["id"] == todo_id
     
-    def test_toggle_todo_nonexistent(self, client, populated_database):
+    def test_toggle_todo_nonexistent(self, client, populated_database, missing_id):
         """Test toggling non-existent todo"""
-        fake_id = str(uuid.uuid4())
-        
-        response = client.patch(f"/api/todos/{fake_id}/toggle")
+        response = client.patch(f"/api/todos/{missing_id}/toggle")
         
         assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Todo not found"
+        assert response.content == _NOT_FOUND_BODY
 
 
 class TestStatsEndpoint:
@@ -371,20 +336,8 @@ class TestStatsEndpoint:
         assert response.status_code == 200
         stats = response.json()
         
-        assert "total" in stats
-        assert "active" in stats
-        assert "completed" in stats
-        assert "completion_rate" in stats
-        assert "priority_breakdown" in stats
-        
+        _assert_stats_shape(stats)
         assert stats["total"] == 3
-        assert stats["active"] + stats["completed"] == stats["total"]
-        assert isinstance(stats["completion_rate"], (int, float))
-        
-        priority_breakdown = stats["priority_breakdown"]
-        assert "high" in priority_breakdown
-        assert "medium" in priority_breakdown
-        assert "low" in priority_breakdown
     
     def test_get_stats_empty_database(self, client, clean_database):
         """Test getting stats from empty database"""
@@ -393,8 +346,8 @@ class TestStatsEndpoint:
         assert response.status_code == 200
         stats = response.json()
         
+        _assert_stats_shape(stats)
         assert stats["total"] > 0  # Should auto-initialize
-        assert stats["active"] + stats["completed"] == stats["total"]
 
 
 class TestClearCompletedEndpoint:
@@ -403,30 +356,52 @@ class TestClearCompletedEndpoint:
     def test_clear_completed_todos(self, client, populated_database):
         """Test clearing completed todos"""
         # First, mark some todos as completed
-        todos = client.get("/api/todos").json()
-        client.put(f"/api/todos/{todos[0]['id']}", json={"completed": True})
-        client.put(f"/api/todos/{todos[2]['id']}", json={"completed": True})
+        client.put(f"/api/todos/{populated_database[0].id}", json={"completed": True})
+        client.put(f"/api/todos/{populated_database[2].id}", json={"completed": True})
         
         response = client.delete("/api/todos/completed")
         
         assert response.status_code == 200
         data = response.json()
-        assert "message" in data
-        assert "deleted_count" in data
+        assert data.keys() >= {"message", "deleted_count"}
         assert data["deleted_count"] == 2
         
         # Verify completed todos are deleted
         remaining_todos = client.get("/api/todos").json()
-        for todo in remaining_todos:
-            assert not todo["completed"]
+        assert all(not todo["completed"] for todo in remaining_todos)
+    
+    @pytest.mark.concurrent
+    @pytest.mark.asyncio
+    async def test_clear_completed_todos_concurrent_setup(self, async_client, populated_database):
+        """Test clearing completed todos marked by overlapping requests"""
+        # First, mark some todos as completed (independent writes, sent together)
+        await asyncio.gather(
+            async_client.put(f"/api/todos/{populated_database[0].id}", json={"completed": True}),
+            async_client.put(f"/api/todos/{populated_database[2].id}", json={"completed": True}),
+        )
+        
+        response = await async_client.delete("/api/todos/completed")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data.keys() >= {"message", "deleted_count"}
+        assert data["deleted_count"] == 2
+        
+        # Verify completed todos are deleted
+        remaining_todos = (await async_client.get("/api/todos")).json()
+        assert all(not todo["completed"] for todo in remaining_todos)
     
     def test_clear_completed_todos_none_completed(self, client, populated_database):
         """Test clearing when no todos are completed"""
+        # The seeded set includes completed todos; reopen them first
+        for todo in populated_database:
+            if todo.completed:
+                client.put(f"/api/todos/{todo.id}", json={"completed": False})
+        
         response = client.delete("/api/todos/completed")
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["deleted_count"] == 0
+        assert b'"deleted_count":0' in response.content
 
 
 class TestCORSHeaders:
@@ -464,3 +439,14 @@ class TestErrorHandling:
         response = client.patch("/api/todos")
         
         assert response.status_code == 405  # Method Not Allowed
+    
+    def test_unhandled_exception_handler(self):
+        """Test the catch-all exception handler returns a generic 500"""
+        from starlette.requests import Request
+        from main import unhandled_exception_handler
+        
+        request = Request({"type": "http", "method": "GET", "path": "/boom", "headers": [], "query_string": b""})
+        response = asyncio.run(unhandled_exception_handler(request, RuntimeError("boom")))
+        
+        assert response.status_code == 500
+        assert response.body == b'{"detail":"Internal server error"}'
@@ -3,14 +3,31 @@ Tests for database operations and CRUD functions
 """
 
 import pytest
-from datetime import datetime
+from datetime import datetime, date, time, timedelta
 import uuid
+import database
 from database import (
-    get_todos, get_todo_by_id, create_todo, update_todo, delete_todo,
-    clear_completed_todos, get_todos_count, initialize_sample_data,
-    _generate_id, _get_current_timestamp
+    get_todos, get_todo_by_id, create_todo, create_todos, update_todo, delete_todo,
+    clear_completed_todos, get_todos_count, get_stats, initialize_sample_data,
+    toggle_todo, bulk_set_completed, candidates_for_reminders, TodoNotFoundError,
+    _generate_id, _parse_id, _get_current_timestamp
 )
-from models import TodoCreate, TodoUpdate, Priority
+from models import Todo, TodoCreate, TodoUpdate, Priority
+
+# Shared, read-only update payload (update_todo never mutates it)
+_UPDATE_COMPLETED = TodoUpdate(completed=True)
+
+# (fixture, which id to use, whether the todo exists) for the by-id lookups
+_BY_ID_CASES = pytest.mark.parametrize("fixture_name,id_source,expected", [
+    ("populated_database", "first", True),
+    ("populated_database", "fake", False),
+    ("clean_database", "fake", False),
+], ids=["existing", "nonexistent", "empty_database"])
+
+
+def _pick_id(seeded, id_source, missing_id):
+    """Id of the first seeded todo, or an id that matches nothing"""
+    return seeded[0].id if id_source == "first" else missing_id
 
 
 class TestDatabaseUtilities:
@@ -28,6 +45,14 @@ class TestDatabaseUtilities:
         uuid.UUID(id1)
         uuid.UUID(id2)
     
+    def test_parse_id(self):
+        """Test API ids are converted to UUID primary keys"""
+        todo_id = _generate_id()
+        
+        assert _parse_id(todo_id) == uuid.UUID(todo_id)
+        assert _parse_id("nonexistent-id") is None
+        assert _parse_id("") is None
+    
     def test_get_current_timestamp(self):
         """Test timestamp generation"""
         timestamp1 = _get_current_timestamp()
@@ -83,43 +108,101 @@ class TestGetTodos:
         assert todos[1].text == "Test todo 2"
         assert todos[2].text == "Test todo 3"
     
-    def test_get_todos_returns_copy(self, populated_database):
-        """Test that get_todos returns a copy, not reference"""
+    def test_get_todos_returns_snapshot(self, populated_database):
+        """Test that get_todos returns a read-only snapshot unaffected by later writes"""
         todos1 = get_todos()
         todos2 = get_todos()
         
-        # Should be different objects
-        assert todos1 is not todos2
+        # Callers get an immutable view, not a list they could edit in place
+        with pytest.raises(TypeError):
+            todos1[0] = todos1[1]
         
-        # But should have same content
+        # Unchanged store should hand back the same content
         assert len(todos1) == len(todos2)
         assert todos1[0].id == todos2[0].id
+        
+        # Writes must not leak into a previously returned snapshot
+        create_todo(TodoCreate(text="Snapshot todo"))
+        assert get_todos_count() == len(todos1) + 1
+        assert all(todo.text != "Snapshot todo" for todo in todos1)
+    
+    def test_get_todos_cached_until_write(self, populated_database):
+        """Test that repeated reads are served from the cache until a write"""
+        filtered = get_todos(filter="active", priority="high")
+        assert get_todos(filter="active", priority="high") is filtered
+        
+        created = create_todo(TodoCreate(text="Cache probe", priority=Priority.HIGH))
+        refreshed = get_todos(filter="active", priority="high")
+        
+        assert refreshed is not filtered
+        assert created.id in {todo.id for todo in refreshed}
+
+    
+    def test_cache_miss_loads_without_lock(self, populated_database):
+        """Test a cache miss runs its load outside the cache lock"""
+        lock_held = []
+        
+        def load():
+            lock_held.append(database._read_cache_lock.locked())
+            return ()
+        
+        database._cached_read(("lock-probe",), load)
+        
+        assert lock_held == [False]
+    
+    def test_cache_skips_result_invalidated_during_load(self, populated_database):
+        """Test a result loaded across a write is returned but not cached"""
+        def load():
+            database._drop_cached_reads()
+            return ("stale",)
+        
+        assert database._cached_read(("race-probe",), load) == ("stale",)
+        assert ("race-probe",) not in database._read_cache
+    
+    def test_cache_bypassed_when_disabled(self, populated_database, monkeypatch):
+        """Test every read loads afresh when the cache is off (several workers, one database)"""
+        monkeypatch.setattr(database, "_READ_CACHE_ENABLED", False)
+        loads = []
+        
+        for _ in range(2):
+            database._cached_read(("bypass-probe",), lambda: loads.append(1) or ())
+        
+        assert len(loads) == 2
+        assert ("bypass-probe",) not in database._read_cache
+    
+    def test_get_todos_with_filters(self, clean_database):
+        """Test status, search and priority filters applied by get_todos"""
+        create_todo(TodoCreate(text="Filter probe alpha", priority=Priority.HIGH))
+        beta = create_todo(TodoCreate(text="Filter probe beta", priority=Priority.LOW))
+        update_todo(beta.id, _UPDATE_COMPLETED)
+        
+        high = get_todos(search="FILTER PROBE", priority="high")
+        assert [todo.text for todo in high] == ["Filter probe alpha"]
+        
+        completed = get_todos(filter="completed", search="filter probe")
+        assert [todo.id for todo in completed] == [beta.id]
+        
+        assert get_todos(filter="active", search="probe beta") == ()
+        assert len(get_todos(filter="all", search="filter probe")) == 2
+        assert get_todos(priority=Priority.HIGH, search="filter probe") == high
+        assert get_todos(priority="urgent") == ()
 
 
 class TestGetTodoById:
     """Test get_todo_by_id function"""
     
-    def test_get_todo_by_id_existing(self, populated_database):
-        """Test getting existing todo by ID"""
-        todos = get_todos()
-        todo_id = todos[0].id
+    @_BY_ID_CASES
+    def test_get_todo_by_id(self, request, missing_id, fixture_name, id_source, expected):
+        """Test getting a todo by ID from a populated or empty database"""
+        todo_id = _pick_id(request.getfixturevalue(fixture_name), id_source, missing_id)
         
         retrieved_todo = get_todo_by_id(todo_id)
-        assert retrieved_todo is not None
-        assert retrieved_todo.id == todo_id
-        assert retrieved_todo.text == "Test todo 1"
-    
-    def test_get_todo_by_id_nonexistent(self, populated_database):
-        """Test getting non-existent todo by ID"""
-        fake_id = str(uuid.uuid4())
-        retrieved_todo = get_todo_by_id(fake_id)
-        assert retrieved_todo is None
-    
-    def test_get_todo_by_id_empty_database(self, clean_database):
-        """Test getting todo by ID from empty database"""
-        fake_id = str(uuid.uuid4())
-        retrieved_todo = get_todo_by_id(fake_id)
-        assert retrieved_todo is None
+        if expected:
+            assert retrieved_todo is not None
+            assert retrieved_todo.id == todo_id
+            assert retrieved_todo.text == "Test todo 1"
+        else:
+            assert retrieved_todo is None
 
 
 class TestCreateTodo:
@@ -159,22 +242,46 @@ class TestCreateTodo:
     
     def test_create_todo_with_existing_data(self, populated_database):
         """Test creating todo when database already has data"""
-        initial_count = len(get_todos())
+        initial_count = get_todos_count()
         
         todo_data = TodoCreate(text="Additional todo")
         created_todo = create_todo(todo_data)
         
-        todos = get_todos()
-        assert len(todos) == initial_count + 1
+        assert get_todos_count() == initial_count + 1
         assert created_todo.text == "Additional todo"
 
 
+class TestCreateTodos:
+    """Test create_todos function"""
+    
+    def test_create_todos(self, populated_database):
+        """Test todos are created in input order and all become readable"""
+        items = [
+            TodoCreate(text="Bulk todo 1", priority=Priority.HIGH),
+            TodoCreate(text="Bulk todo 2", completed=True),
+        ]
+        
+        created = create_todos(items)
+        
+        assert [todo.text for todo in created] == ["Bulk todo 1", "Bulk todo 2"]
+        assert created[0].priority == Priority.HIGH
+        assert created[1].completed is True
+        assert len({todo.id for todo in created}) == 2
+        assert all(get_todo_by_id(todo.id) == todo for todo in created)
+        assert get_todos_count() == len(populated_database) + 2
+    
+    def test_create_todos_empty(self, populated_database):
+        """Test an empty batch creates nothing"""
+        assert create_todos([]) == []
+        assert get_todos_count() == len(populated_database)
+
+
 class TestUpdateTodo:
     """Test update_todo function"""
     
     def test_update_todo_existing(self, populated_database):
         """Test updating existing todo"""
-        todos = get_todos()
+        todos = populated_database
         todo_id = todos[0].id
         original_text = todos[0].text
         
@@ -199,7 +306,7 @@ class TestUpdateTodo:
     
     def test_update_todo_partial(self, populated_database):
         """Test partial update of todo"""
-        todos = get_todos()
+        todos = populated_database
         todo_id = todos[0].id
         original_priority = todos[0].priority
         
@@ -211,47 +318,74 @@ class TestUpdateTodo:
         assert updated_todo.priority == original_priority  # Should remain unchanged
         assert updated_todo.completed == todos[0].completed  # Should remain unchanged
     
-    def test_update_todo_nonexistent(self, populated_database):
+    def test_update_todo_nonexistent(self, populated_database, missing_id):
         """Test updating non-existent todo"""
-        fake_id = str(uuid.uuid4())
         update_data = TodoUpdate(text="This should fail")
         
         with pytest.raises(ValueError, match="Todo with id .* not found"):
-            update_todo(fake_id, update_data)
+            update_todo(missing_id, update_data)
 
 
-class TestDeleteTodo:
-    """Test delete_todo function"""
+class TestToggleTodo:
+    """Test toggle_todo function"""
     
-    def test_delete_todo_existing(self, populated_database):
-        """Test deleting existing todo"""
-        todos = get_todos()
-        todo_id = todos[0].id
-        initial_count = len(todos)
+    def test_toggle_todo_flips_completed(self, populated_database):
+        """Test toggling flips completion and leaves other fields alone"""
+        todo = populated_database[0]
         
-        success = delete_todo(todo_id)
+        toggled = toggle_todo(todo.id)
         
-        assert success is True
-        assert len(get_todos()) == initial_count - 1
-        
-        # Todo should no longer exist
-        assert get_todo_by_id(todo_id) is None
+        assert toggled.completed is not todo.completed
+        assert toggled.text == todo.text
+        assert toggled.priority == todo.priority
+        assert get_todo_by_id(todo.id).completed is toggled.completed
+        assert toggle_todo(todo.id).completed is todo.completed
     
-    def test_delete_todo_nonexistent(self, populated_database):
-        """Test deleting non-existent todo"""
-        fake_id = str(uuid.uuid4())
-        initial_count = len(get_todos())
+    def test_toggle_todo_nonexistent(self, populated_database, missing_id):
+        """Test toggling non-existent todo"""
+        with pytest.raises(TodoNotFoundError):
+            toggle_todo(missing_id)
+
+
+class TestBulkSetCompleted:
+    """Test bulk_set_completed function"""
+    
+    def test_bulk_set_completed(self, populated_database, missing_id):
+        """Test only the given todos change, and unknown ids are skipped"""
+        first, second, third = populated_database
         
-        success = delete_todo(fake_id)
+        updated_count = bulk_set_completed([first.id, second.id, missing_id], False)
         
-        assert success is False
-        assert len(get_todos()) == initial_count  # Should remain unchanged
+        assert updated_count == 2
+        assert get_todo_by_id(first.id).completed is False
+        assert get_todo_by_id(second.id).completed is False
+        assert get_todo_by_id(third.id).completed is third.completed
+        assert get_stats()["completed"] == sum(1 for todo in get_todos() if todo.completed)
+    
+    def test_bulk_set_completed_no_ids(self, populated_database):
+        """Test an empty id set updates nothing"""
+        assert bulk_set_completed([], True) == 0
+
+
+class TestDeleteTodo:
+    """Test delete_todo function"""
     
-    def test_delete_todo_empty_database(self, clean_database):
-        """Test deleting from empty database"""
-        fake_id = str(uuid.uuid4())
-        success = delete_todo(fake_id)
-        assert success is False
+    @_BY_ID_CASES
+    def test_delete_todo(self, request, missing_id, fixture_name, id_source, expected):
+        """Test deleting a todo by ID from a populated or empty database"""
+        todo_id = _pick_id(request.getfixturevalue(fixture_name), id_source, missing_id)
+        # Only count a populated store; counting an empty one would auto-seed it
+        populated = fixture_name == "populated_database"
+        initial_count = get_todos_count() if populated else None
+        
+        success = delete_todo(todo_id)
+        
+        assert success is expected
+        if populated:
+            assert get_todos_count() == initial_count - (1 if expected else 0)
+        if expected:
+            # Todo should no longer exist
+            assert get_todo_by_id(todo_id) is None
 
 
 class TestClearCompletedTodos:
@@ -259,17 +393,17 @@ class TestClearCompletedTodos:
     
     def test_clear_completed_todos(self, populated_database):
         """Test clearing completed todos"""
-        todos = get_todos()
+        todos = populated_database
         initial_count = len(todos)
         
         # Mark some todos as completed
-        update_todo(todos[0].id, TodoUpdate(completed=True))
-        update_todo(todos[2].id, TodoUpdate(completed=True))
+        update_todo(todos[0].id, _UPDATE_COMPLETED)
+        update_todo(todos[2].id, _UPDATE_COMPLETED)
         
         deleted_count = clear_completed_todos()
         
         assert deleted_count == 2
-        assert len(get_todos()) == initial_count - 2
+        assert get_todos_count() == initial_count - 2
         
         # Remaining todos should not be completed
         remaining_todos = get_todos()
@@ -278,18 +412,29 @@ class TestClearCompletedTodos:
     
     def test_clear_completed_todos_none_completed(self, populated_database):
         """Test clearing when no todos are completed"""
-        todos = get_todos()
-        initial_count = len(todos)
+        # The seeded set includes completed todos; reopen them first
+        for todo in populated_database:
+            if todo.completed:
+                update_todo(todo.id, TodoUpdate(completed=False))
+        initial_count = len(populated_database)
         
         deleted_count = clear_completed_todos()
         
         assert deleted_count == 0
-        assert len(get_todos()) == initial_count
+        assert get_todos_count() == initial_count
     
     def test_clear_completed_todos_empty_database(self, clean_database):
         """Test clearing from empty database"""
         deleted_count = clear_completed_todos()
-        assert deleted_count == 0
+        
+        if database._PERSIST:
+            assert deleted_count == 0
+        else:
+            # The in-memory store seeds sample data before clearing, so exactly
+            # the seeded completed todos are removed
+            assert not any(todo.completed for todo in get_todos())
+            initialize_sample_data()
+            assert deleted_count == sum(todo.completed for todo in get_todos())
 
 
 class TestGetTodosCount:
@@ -320,6 +465,105 @@ class TestGetTodosCount:
         assert get_todos_count() == initial_count
 
 
+class TestGetStats:
+    """Test get_stats function"""
+    
+    def test_get_stats_consistent_with_todos(self, clean_database):
+        """Test stats agree with the stored todos"""
+        create_todo(TodoCreate(text="Stats todo", priority=Priority.HIGH))
+        stats = get_stats()
+        todos = get_todos()
+        
+        assert stats["total"] == len(todos) == get_todos_count()
+        assert stats["completed"] == len([todo for todo in todos if todo.completed])
+        assert stats["active"] + stats["completed"] == stats["total"]
+        assert sum(stats["priority_breakdown"].values()) == stats["total"]
+        assert stats["priority_breakdown"]["high"] >= 1
+    
+    def test_get_stats_tracks_writes(self, clean_database):
+        """Test stats stay correct as todos are created, toggled and deleted"""
+        baseline = get_stats()
+        
+        first = create_todo(TodoCreate(text="Counted high", priority=Priority.HIGH))
+        second = create_todo(TodoCreate(text="Counted low", priority=Priority.LOW))
+        toggle_todo(first.id)
+        delete_todo(second.id)
+        
+        stats = get_stats()
+        assert stats["total"] == baseline["total"] + 1
+        assert stats["completed"] == baseline["completed"] + 1
+        assert stats["priority_breakdown"]["high"] == baseline["priority_breakdown"]["high"] + 1
+        assert stats["priority_breakdown"]["low"] == baseline["priority_breakdown"]["low"]
+        
+        clear_completed_todos()
+        assert get_stats()["completed"] == 0
+
+
+def _reminder_cases(today):
+    """(text, due_date, reminder_time, completed, is_candidate) rows for the reminder tests"""
+    return [
+        ("Due today", today, time(9, 0), False, True),
+        ("Due tomorrow", today + timedelta(days=1), time(9, 0), False, True),
+        ("Due later", today + timedelta(days=3), time(9, 0), False, False),
+        ("No reminder", today, None, False, False),
+        ("Already done", today, time(9, 0), True, False),
+    ]
+
+
+class TestCandidatesForReminders:
+    """Test candidates_for_reminders function"""
+    
+    @pytest.mark.skipif(database._PERSIST, reason="seeds the in-memory store directly")
+    def test_candidates_for_reminders_filters(self, clean_database):
+        """Test only open todos with a reminder due today or tomorrow are returned"""
+        today = date.today()
+        now = _get_current_timestamp()
+        expected_ids = set()
+        
+        for text, due_date, reminder_time, completed, is_candidate in _reminder_cases(today):
+            todo = Todo(
+                id=_generate_id(), text=text, completed=completed,
+                due_date=due_date, reminder_time=reminder_time,
+                created_at=now, updated_at=now
+            )
+            database._todos[todo.id] = todo
+            if is_candidate:
+                expected_ids.add(todo.id)
+        database._invalidate_reads()
+        
+        candidates = candidates_for_reminders(today, today + timedelta(days=1))
+        
+        assert {todo.id for todo in candidates} == expected_ids
+    
+    @pytest.mark.skipif(not database._PERSIST, reason="persistent storage only")
+    def test_candidates_for_reminders_filters_sql(self, clean_database, db_session):
+        """Test the SQL query applies the same filters and returns the schedule fields"""
+        from sqlalchemy import insert
+        from orm_models import TodoORM
+        
+        today = date.today()
+        now = _get_current_timestamp()
+        rows = [
+            {
+                "id": uuid.uuid4(), "text": text, "priority": Priority.MEDIUM.value,
+                "completed": completed, "due_date": due_date, "reminder_time": reminder_time,
+                "created_at": now, "updated_at": now,
+            }
+            for text, due_date, reminder_time, completed, _ in _reminder_cases(today)
+        ]
+        # create_todo doesn't store schedule fields, so seed the rows directly
+        db_session.execute(insert(TodoORM), rows)
+        db_session.commit()
+        expected = {
+            str(row["id"]): (row["due_date"], row["reminder_time"])
+            for row, case in zip(rows, _reminder_cases(today)) if case[-1]
+        }
+        
+        candidates = candidates_for_reminders(today, today + timedelta(days=1))
+        
+        assert {todo.id: (todo.due_date, todo.reminder_time) for todo in candidates} == expected
+
+
 class TestDatabaseConsistency:
     """Test database consistency and edge cases"""
     
@@ -333,7 +577,7 @@ class TestDatabaseConsistency:
         todo2 = create_todo(todo2_data)
         
         # Update todo1
-        update_todo(todo1.id, TodoUpdate(completed=True))
+        update_todo(todo1.id, _UPDATE_COMPLETED)
         
         # Delete todo2
         delete_todo(todo2.id)
@@ -346,11 +590,10 @@ class TestDatabaseConsistency:
     
     def test_concurrent_operations_simulation(self, populated_database):
         """Test simulating concurrent operations"""
-        todos = get_todos()
+        todos = populated_database
         
         # Simulate multiple updates
-        for todo in todos:
-            update_todo(todo.id, TodoUpdate(completed=True))
+        assert bulk_set_completed({todo.id for todo in todos}, True) == len(todos)
         
         # All should be completed
         updated_todos = get_todos()
@@ -360,4 +603,4 @@ class TestDatabaseConsistency:
         # Clear completed
         deleted_count = clear_completed_todos()
         assert deleted_count == len(todos)
-        assert len(get_todos()) == 0
+        assert get_todos_count() == 0
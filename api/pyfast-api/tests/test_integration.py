@@ -5,7 +5,6 @@ Integration tests for complete workflows
 import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime
-import uuid
 
 
 class TestCompleteTodoWorkflow:
@@ -241,24 +240,23 @@ class TestSearchAndFilterCombinations:
 class TestErrorRecovery:
     """Test error recovery and edge cases"""
     
-    def test_error_recovery_workflow(self, client, clean_database):
+    def test_error_recovery_workflow(self, client, clean_database, missing_id):
         """Test that the API recovers gracefully from errors"""
         
         # Try to get non-existent todo
-        fake_id = str(uuid.uuid4())
-        response = client.get(f"/api/todos/{fake_id}")
+        response = client.get(f"/api/todos/{missing_id}")
         assert response.status_code == 404
         
         # Try to update non-existent todo
-        response = client.put(f"/api/todos/{fake_id}", json={"text": "This should fail"})
+        response = client.put(f"/api/todos/{missing_id}", json={"text": "This should fail"})
         assert response.status_code == 404
         
         # Try to delete non-existent todo
-        response = client.delete(f"/api/todos/{fake_id}")
+        response = client.delete(f"/api/todos/{missing_id}")
         assert response.status_code == 404
         
         # Try to toggle non-existent todo
-        response = client.patch(f"/api/todos/{fake_id}/toggle")
+        response = client.patch(f"/api/todos/{missing_id}/toggle")
         assert response.status_code == 404
         
         # After all these errors, normal operations should still work
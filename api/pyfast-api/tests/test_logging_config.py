@@ -6,14 +6,15 @@ import pytest
 import os
 import tempfile
 import logging
+import logging.handlers
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
 import structlog
 
 from logging_config import (
     setup_logging, get_logger, log_api_request, log_database_operation,
-    log_business_logic, setup_environment_logging, ColoredFormatter,
-    LOG_LEVELS, LOG_COLORS
+    log_business_logic, setup_environment_logging, init_logging, ColoredFormatter,
+    LOG_LEVELS, LOG_COLORS, _stop_queue_listener, _orjson_dumps
 )
 
 
@@ -113,6 +114,18 @@ class TestLoggingSetup:
             root_logger = logging.getLogger()
             assert len(root_logger.handlers) > 0
     
+    def test_orjson_dumps_serializer(self):
+        """Test the orjson-backed serializer used by the JSON renderer"""
+        import json
+        
+        rendered = _orjson_dumps({"event": "test", 1: "int key", "obj": object()}, default=repr)
+        
+        assert isinstance(rendered, str)
+        data = json.loads(rendered)
+        assert data["event"] == "test"
+        assert data["1"] == "int key"
+        assert data["obj"].startswith("<object")
+    
     def test_setup_logging_custom_file(self):
         """Test logging setup with custom log file"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -130,6 +143,29 @@ class TestLoggingSetup:
             log_file_path = Path(temp_dir) / custom_log_file
             assert log_file_path.exists()
     
+    def test_setup_logging_with_queue(self):
+        """Test queued logging hands records to a background listener"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            setup_logging(
+                log_level="INFO",
+                log_file="queued.log",
+                log_dir=temp_dir,
+                enable_console=False,
+                enable_file=True,
+                enable_queue=True
+            )
+            
+            root_logger = logging.getLogger()
+            assert len(root_logger.handlers) == 1
+            assert isinstance(root_logger.handlers[0], logging.handlers.QueueHandler)
+            
+            get_logger("queue.test").info("Queued message")
+            
+            # Stopping the listener flushes everything still queued
+            _stop_queue_listener()
+            log_content = (Path(temp_dir) / "queued.log").read_text()
+            assert "Queued message" in log_content
+    
     def test_setup_logging_creates_directories(self):
         """Test that setup_logging creates necessary directories"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -315,7 +351,8 @@ class TestEnvironmentLogging:
             log_dir='/tmp/test_logs',
             enable_console=True,
             enable_file=False,
-            enable_json=True
+            enable_json=True,
+            enable_queue=True
         )
     
     @patch.dict(os.environ, {}, clear=True)
@@ -329,7 +366,8 @@ class TestEnvironmentLogging:
             log_dir='logs',
             enable_console=True,
             enable_file=True,
-            enable_json=False
+            enable_json=False,
+            enable_queue=True
         )
     
     @patch.dict(os.environ, {
@@ -347,6 +385,17 @@ class TestEnvironmentLogging:
         assert call_args['enable_console'] is False
         assert call_args['enable_file'] is True
         assert call_args['enable_json'] is False
+    
+    @patch('logging_config.init')
+    @patch('logging_config.setup_environment_logging')
+    def test_init_logging_runs_once(self, mock_setup_env, mock_colorama_init):
+        """Test init_logging only configures logging on the first call"""
+        with patch('logging_config._initialized', False):
+            init_logging()
+            init_logging()
+        
+        mock_setup_env.assert_called_once()
+        mock_colorama_init.assert_called_once_with(autoreset=True)
 
 
 class TestLoggingIntegration:
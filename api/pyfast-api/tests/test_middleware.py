@@ -10,7 +10,7 @@ import time
 from unittest.mock import patch, MagicMock
 import structlog
 
-from middleware import LoggingMiddleware, ErrorHandlingMiddleware, log_api_request
+from middleware import LoggingMiddleware, SelectiveGZipMiddleware, log_api_request
 
 
 class TestLoggingMiddleware:
@@ -95,55 +95,32 @@ class TestLoggingMiddleware:
         assert "extra_param" in call_args[1]
 
 
-class TestErrorHandlingMiddleware:
-    """Test ErrorHandlingMiddleware functionality"""
+class TestSelectiveGZipMiddleware:
+    """Test SelectiveGZipMiddleware functionality"""
     
-    def test_middleware_initialization(self):
-        """Test middleware can be initialized"""
-        app = FastAPI()
-        middleware = ErrorHandlingMiddleware(app)
-        assert middleware.app == app
-    
-    @patch('middleware.logger')
-    def test_middleware_handles_http_errors(self, mock_logger):
-        """Test middleware handles HTTP errors"""
+    def test_gzip_compresses_except_excluded_paths(self):
+        """Test large responses are gzipped unless their path is excluded"""
         app = FastAPI()
+        app.add_middleware(SelectiveGZipMiddleware, minimum_size=100, exclude_paths=("/health",))
         
-        @app.get("/error")
-        async def error_endpoint():
-            raise HTTPException(status_code=500, detail="Test error")
+        payload = {"items": ["spicy"] * 200}
         
-        middleware = ErrorHandlingMiddleware(app)
+        @app.get("/large")
+        async def large_endpoint():
+            return payload
         
-        # The middleware should catch the exception and log it
-        with TestClient(app) as client:
-            response = client.get("/error")
-            # FastAPI's built-in error handling should handle this
-            assert response.status_code == 500
-    
-    @patch('middleware.logger')
-    def test_middleware_handles_non_http_errors(self, mock_logger):
-        """Test middleware handles non-HTTP errors"""
-        app = FastAPI()
-        middleware = ErrorHandlingMiddleware(app)
+        @app.get("/health")
+        async def health_endpoint():
+            return payload
         
-        # Mock non-HTTP scope with error
-        scope = {"type": "websocket"}
-        receive = MagicMock()
-        send = MagicMock()
-        
-        # Mock the app to raise an exception
-        async def error_app(scope, receive, send):
-            raise Exception("Test error")
-        
-        middleware.app = error_app
-        
-        # Should log the error but re-raise for non-HTTP
-        with pytest.raises(Exception, match="Test error"):
-            import asyncio
-            asyncio.run(middleware(scope, receive, send))
-        
-        mock_logger.error.assert_called_once()
+        with TestClient(app) as client:
+            response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+            assert response.headers.get("content-encoding") == "gzip"
+            assert response.json() == payload
+            
+            response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+            assert response.json() == payload
 
 
 class TestMiddlewareIntegration:
@@ -154,7 +131,7 @@ class TestMiddlewareIntegration:
         app = FastAPI()
         
         # Add middleware in specific order
-        app.add_middleware(ErrorHandlingMiddleware)
+        app.add_middleware(SelectiveGZipMiddleware)
         app.add_middleware(LoggingMiddleware)
         
         @app.get("/test")
@@ -181,7 +158,6 @@ class TestMiddlewareIntegration:
             allow_methods=["*"],
             allow_headers=["*"],
         )
-        app.add_middleware(ErrorHandlingMiddleware)
         app.add_middleware(LoggingMiddleware)
         
         @app.get("/test")
@@ -10,6 +10,9 @@ from fastapi.testclient import TestClient
 import json
 from datetime import datetime
 
+import database
+from database import create_todo, delete_todo, get_todo_by_id
+from models import TodoCreate
 from main import app
 
 
@@ -62,31 +65,25 @@ class TestAPIPerformance:
         response_time = end_time - start_time
         assert response_time < 0.3  # Should respond in under 300ms
     
-    def test_update_todo_performance(self, client, populated_database):
+    def test_update_todo_performance(self, client, first_todo_id):
         """Test update todo endpoint performance"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        
         update_data = {
             "text": "Updated performance test todo",
             "completed": True
         }
         
         start_time = time.time()
-        response = client.put(f"/api/todos/{todo_id}", json=update_data)
+        response = client.put(f"/api/todos/{first_todo_id}", json=update_data)
         end_time = time.time()
         
         assert response.status_code == 200
         response_time = end_time - start_time
         assert response_time < 0.3  # Should respond in under 300ms
     
-    def test_delete_todo_performance(self, client, populated_database):
+    def test_delete_todo_performance(self, client, first_todo_id):
         """Test delete todo endpoint performance"""
-        todos = client.get("/api/todos").json()
-        todo_id = todos[0]["id"]
-        
         start_time = time.time()
-        response = client.delete(f"/api/todos/{todo_id}")
+        response = client.delete(f"/api/todos/{first_todo_id}")
         end_time = time.time()
         
         assert response.status_code == 200
@@ -107,6 +104,7 @@ class TestAPIPerformance:
 class TestConcurrentOperations:
     """Test concurrent operation handling"""
     
+    @pytest.mark.concurrent
     def test_concurrent_get_requests(self, client, populated_database):
         """Test handling multiple concurrent GET requests"""
         def make_request():
@@ -122,6 +120,7 @@ class TestConcurrentOperations:
         assert all(results)
         assert len(results) == 20
     
+    @pytest.mark.concurrent
     def test_concurrent_create_requests(self, client, clean_database):
         """Test handling multiple concurrent POST requests"""
         def create_todo(index):
@@ -146,6 +145,7 @@ class TestConcurrentOperations:
         todos = client.get("/api/todos").json()
         assert len(todos) >= 10  # Should have at least 10 todos
     
+    @pytest.mark.concurrent
     def test_concurrent_update_requests(self, client, populated_database):
         """Test handling multiple concurrent PUT requests"""
         # First, create more todos for concurrent updates
@@ -179,6 +179,7 @@ class TestConcurrentOperations:
         successful_updates = sum(1 for r in results if r)
         assert successful_updates > 0
     
+    @pytest.mark.concurrent
     def test_mixed_concurrent_operations(self, client, clean_database):
         """Test mixed concurrent operations (GET, POST, PUT, DELETE)"""
         def random_operation(index):
@@ -370,6 +371,42 @@ class TestMemoryUsage:
         assert response.status_code == 200
 
 
+class TestStoreLookupPerformance:
+    """Test by-id access stays constant-time as the store grows"""
+    
+    @staticmethod
+    def _per_op_times(size):
+        """Mean seconds per get_todo_by_id and per delete_todo for 100 ids spread over `size` todos"""
+        database._todos.clear()
+        ids = [create_todo(TodoCreate(text=f"Scale todo {i}")).id for i in range(size)]
+        probes = ids[::size // 100]
+        
+        # Best of a few passes, so one scheduler hiccup can't fail the ratio below
+        lookup_time = float("inf")
+        for _ in range(5):
+            start_time = time.perf_counter()
+            for todo_id in probes:
+                assert get_todo_by_id(todo_id) is not None
+            lookup_time = min(lookup_time, time.perf_counter() - start_time)
+        
+        start_time = time.perf_counter()
+        for todo_id in probes:
+            assert delete_todo(todo_id) is True
+        delete_time = time.perf_counter() - start_time
+        return lookup_time / len(probes), delete_time / len(probes)
+    
+    @pytest.mark.skipif(database._PERSIST, reason="in-memory store only")
+    def test_lookup_and_delete_scale(self, clean_database):
+        """Test get_todo_by_id/delete_todo don't scan the store"""
+        small_lookup, small_delete = self._per_op_times(100)
+        large_lookup, large_delete = self._per_op_times(10_000)
+        
+        # A scan would make each op ~100x slower on the 100x larger store;
+        # keyed access stays within a small factor (absolute floor for timer noise)
+        assert large_lookup < max(small_lookup * 10, 1e-5)
+        assert large_delete < max(small_delete * 10, 1e-5)
+
+
 class TestErrorHandlingPerformance:
     """Test error handling doesn't significantly impact performance"""
     
@@ -210,8 +210,7 @@ class TestDataPrivacy:
         assert response.status_code == 200
         
         created_todo = response.json()
-        assert "created_at" in created_todo
-        assert "updated_at" in created_todo
+        assert created_todo.keys() >= {"created_at", "updated_at"}
         
         # Timestamps should be in ISO format, not reveal system timezone details
         created_at = created_todo["created_at"]
@@ -246,6 +245,7 @@ class TestRateLimiting:
         # In a production system, you might want to add rate limiting
         # and change this test to expect 429 Too Many Requests after a threshold
     
+    @pytest.mark.concurrent
     def test_concurrent_request_handling(self, client, clean_database):
         """Test that concurrent requests don't cause issues"""
         from concurrent.futures import ThreadPoolExecutor, as_completed